@@ -0,0 +1,226 @@
+""""
+Benchmarks of reading, computing on and drawing the data
+
+Run this file directly to time how long importing main takes and every hot path of
+the project (reading the datasets, extracting the RCP series, computing the
+percentage differences, colouring temperatures and drawing the map) on synthetic
+datasets of 10, 100 and 1000 stations x 100 years. The results are written as JSON
+so that runs can be compared:
+
+    python benchmark.py --stations 10,100 --years 100 --out results.json
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from typing import Callable, Dict, List, Tuple
+from unittest import mock
+
+import climate.compute
+import climate.io
+import climate.metrics
+import climate.render
+from climate.compute import calc_cities_actual_pd
+from climate.io import RCP_TYPES, Station, TemperatureStore
+from generate_data import generate_datasets
+
+DEFAULT_STATIONS = (10, 100, 1000)
+DEFAULT_YEARS = 100
+
+
+def make_synthetic_city_temps(stations: int, years: int, seed: int = 110) \
+        -> Dict[int, Tuple[Dict[int, float], Dict[str, List[float]]]]:
+    """Return a mapping of station number to its synthetic actual temperatures and
+    RCP lists, covering the given number of years starting at 2000.
+    """
+    rng = random.Random(seed)
+    city_temps = {}
+    for station in range(stations):
+        base = rng.uniform(-5, 15)
+        actual = {2000 + year: round(base + rng.gauss(0, 1), 2) for year in range(years)}
+        rcp_lists = {rcp_type: [round(base + rng.gauss(0, 1), 2) for _ in range(years)]
+                     for rcp_type in RCP_TYPES}
+        city_temps[station] = (actual, rcp_lists)
+    return city_temps
+
+
+def loop_actual_pd(actual_temps_dict: dict, final_rcp_list: list) -> List[float]:
+    """Return the percentage differences of one RCP list the way calc_low_actual_pd,
+    calc_median_actual_pd and calc_high_actual_pd originally computed them, guarded
+    against an actual temperature of exactly 0 so the synthetic inputs cannot crash it.
+    """
+    actual_temps_list = list(actual_temps_dict.values())
+    rcp_pd = []
+    for index in range(0, len(final_rcp_list)):
+        difference = abs(final_rcp_list[index] - actual_temps_list[index])
+        if actual_temps_list[index] == 0:
+            rcp_pd.append(float('nan'))
+        else:
+            rcp_pd.append(round(((difference / actual_temps_list[index]) * 100), 1))
+    return rcp_pd
+
+
+def benchmark_percentage_difference(stations: int, years: int, repeat: int = 5) \
+        -> Dict[str, float]:
+    """Return the best time in seconds of computing every percentage difference of
+    the synthetic inputs with the original loop and with calc_cities_actual_pd.
+    """
+    city_temps = make_synthetic_city_temps(stations, years)
+
+    def run_loops() -> None:
+        for actual, rcp_lists in city_temps.values():
+            for rcp_type in RCP_TYPES:
+                loop_actual_pd(actual, rcp_lists[rcp_type])
+
+    def run_batched() -> None:
+        calc_cities_actual_pd(city_temps)
+
+    return {'loop': min(timeit.repeat(run_loops, number=1, repeat=repeat)),
+            'batched': min(timeit.repeat(run_batched, number=1, repeat=repeat))}
+
+
+def measure_startup_time(module: str, repeat: int = 3) -> float:
+    """Return the best time in seconds a fresh interpreter takes to start and import
+    module, minus the time it takes to start without importing anything.
+    """
+    def best_time(code: str) -> float:
+        return min(timeit.repeat(lambda: subprocess.run([sys.executable, '-c', code], check=True),
+                                 number=1, repeat=repeat))
+
+    return max(0.0, best_time('import ' + module) - best_time('pass'))
+
+
+def best_time(function: Callable[[], object], repeat: int,
+              setup: Callable[[], object] = lambda: None) -> float:
+    """Return the best time in seconds of repeat calls of function, calling setup
+    untimed before each of them.
+    """
+    times = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def benchmark_hot_paths(stations: List[Station], repeat: int) -> Dict[str, float]:
+    """Return the best time in seconds of every hot path of the project over stations.
+    """
+    original_store = climate.io.STORE
+    times = {}
+
+    def use_store(use_cache: bool) -> None:
+        climate.io.STORE = TemperatureStore(use_cache)
+
+    def read_all() -> None:
+        for station in stations:
+            climate.io.read_predicted_data(station.predicted_path,
+                                           climate.io.read_actual_data(station.actual_path))
+
+    try:
+        times['read_actual_data (streamed, no cache)'] = best_time(
+            lambda: [climate.io.read_actual_data(station.actual_path) for station in stations],
+            repeat, lambda: use_store(False))
+        use_store(True)
+        read_all()
+        times['read_actual_data (sidecar cache)'] = best_time(
+            lambda: [climate.io.read_actual_data(station.actual_path) for station in stations],
+            repeat, lambda: use_store(True))
+        times['read_actual_data + read_predicted_data (parse)'] = best_time(
+            read_all, repeat, lambda: use_store(False))
+        times['read_actual_data + read_predicted_data (in memory)'] = best_time(read_all, repeat)
+
+        city_data = [climate.compute.load_city_data(station) for station in stations]
+        times['make_low/median/high_rcp_list'] = best_time(
+            lambda: [(climate.compute.make_low_rcp_list(predicted),
+                      climate.compute.make_median_rcp_list(predicted),
+                      climate.compute.make_high_rcp_list(predicted))
+                     for _, predicted in city_data], repeat)
+        times['extract_rcp_columns'] = best_time(
+            lambda: [climate.compute.extract_rcp_columns(predicted)
+                     for _, predicted in city_data], repeat)
+
+        rcp_data = [(actual, climate.compute.extract_rcp_columns(predicted))
+                    for actual, predicted in city_data]
+        times['calc_low/median/high_actual_pd'] = best_time(
+            lambda: [(climate.compute.calc_low_actual_pd(actual, rcp_lists['RCP 2.6']),
+                      climate.compute.calc_median_actual_pd(actual, rcp_lists['RCP 4.5']),
+                      climate.compute.calc_high_actual_pd(actual, rcp_lists['RCP 8.5']))
+                     for actual, rcp_lists in rcp_data], repeat)
+        times['calc_cities_actual_pd'] = best_time(
+            lambda: calc_cities_actual_pd(dict(enumerate(rcp_data))), repeat)
+
+        temps = [temp for actual, _ in city_data for temp in actual.values()]
+        times['temp_to_rgb'] = best_time(
+            lambda: [climate.compute.temp_to_rgb(temp) for temp in temps], repeat)
+        times['temps_to_rgb (empty colour table)'] = best_time(
+            lambda: climate.compute.ColourScale(climate.compute.temp_to_rgb).rgb_list(temps),
+            repeat)
+        times['temps_to_rgb'] = best_time(lambda: climate.compute.temps_to_rgb(temps), repeat)
+
+        times['build_summary_cube'] = best_time(
+            lambda: climate.compute.build_summary_cube(stations), repeat)
+        cube = climate.compute.build_summary_cube(stations)
+        times['rank_scenarios'] = best_time(lambda: climate.metrics.rank_scenarios(cube), repeat)
+        year = cube.years.start
+        # drawing is by far the slowest path, so large maps are only drawn once
+        with mock.patch('PIL.Image.Image.show'):
+            times['draw_map (show stubbed)'] = best_time(
+                lambda: climate.render.draw_map(cube, year, 'RCP 4.5'),
+                repeat if len(stations) <= 100 else 1)
+    finally:
+        climate.io.STORE = original_store
+
+    return times
+
+
+def run_benchmarks(station_counts: List[int], years: int, repeat: int) -> dict:
+    """Return the results of benchmark_hot_paths and benchmark_percentage_difference
+    for synthetic data of every number of stations in station_counts, together with the
+    startup time of main and a description of the machine.
+    """
+    startup_seconds = measure_startup_time('main')
+    print(f'import main {startup_seconds * 1000:10.2f} ms')
+
+    results = []
+    for stations in station_counts:
+        with tempfile.TemporaryDirectory() as directory:
+            synthetic_stations = generate_datasets(directory, stations, years)
+            times = benchmark_hot_paths(synthetic_stations, repeat)
+        percentage_difference = benchmark_percentage_difference(stations, years, repeat)
+        times['percentage difference (original loop)'] = percentage_difference['loop']
+        times['percentage difference (calc_cities_actual_pd)'] = percentage_difference['batched']
+        for name, seconds in times.items():
+            results.append({'name': name, 'stations': stations, 'years': years,
+                            'seconds': seconds})
+            print(f'{stations:>5} stations x {years} years  {name:<52} '
+                  f'{seconds * 1000:10.2f} ms')
+
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'startup_seconds': startup_seconds,
+            'results': results}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time the hot paths of the project.')
+    parser.add_argument('--stations', default=','.join(map(str, DEFAULT_STATIONS)),
+                        help='comma separated numbers of synthetic stations')
+    parser.add_argument('--years', type=int, default=DEFAULT_YEARS,
+                        help='number of years of every synthetic station')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs of every benchmark')
+    parser.add_argument('--out', default='benchmark_results.json',
+                        help='JSON file to write the results to')
+    args = parser.parse_args()
+
+    report = run_benchmarks([int(count) for count in args.stations.split(',')],
+                            args.years, args.repeat)
+    with open(args.out, 'w') as file:
+        json.dump(report, file, indent=2)
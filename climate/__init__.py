@@ -0,0 +1,16 @@
+""""
+The shared core of the Climate Change Project
+
+    - climate.io: reading the station catalogue and the actual and predicted datasets
+    - climate.compute: percentage differences, the summary cube and colour scales
+    - climate.render: the graph and table of a city and the maps of every city
+    - climate.metrics: RMSE, MAE, bias and correlation of the predictions, in batch
+    - climate.seasons: seasonal means, extremes and anomalies of the actual datasets
+    - climate.cli: the interactive prompts and the render, animate, grid, report, skill and
+      serve commands
+    - climate.report: a static HTML report of every city and map
+    - climate.server: a local HTTP service for the maps, series and tables
+
+The top-level modules main, project, reading_data and computing_data re-export this
+package so that existing imports and commands keep working.
+"""
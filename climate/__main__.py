@@ -0,0 +1,8 @@
+""""
+Runs the command line interface of the project, e.g. python -m climate render
+"""
+import sys
+
+from climate.cli import main
+
+sys.exit(main())
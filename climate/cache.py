@@ -0,0 +1,216 @@
+""""
+Helper functions responsible for caching parsed datasets on disk
+
+Every parsed CSV file is written next to its source as a binary sidecar
+(<source>.cache) holding its typed columns back to back. Later reads map the
+sidecar into memory and return memoryviews over it, so no column is copied or
+parsed again. A sidecar is only trusted while the size and modification time of
+its source are unchanged, or, if those changed, while the source's content
+hash still matches.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Callable, Dict, Optional, Sequence
+
+CACHE_SUFFIX = '.cache'
+CACHE_MAGIC = b'CLIMCOL1'
+HEADER_LENGTH = struct.Struct('<I')
+ALIGNMENT = 8
+
+
+def cache_path(source_path: str) -> str:
+    """Return the path of the sidecar cache of source_path.
+
+    >>> cache_path('datasets/toronto_actual.csv')
+    'datasets/toronto_actual.csv.cache'
+    """
+    return source_path + CACHE_SUFFIX
+
+
+def source_digest(source_path: str) -> str:
+    """Return the SHA-256 hex digest of the contents of source_path.
+    """
+    digest = hashlib.sha256()
+    with open(source_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_columns(source_path: str, parse: Callable[[str], Dict[str, array]],
+                 schema: str) -> Dict[str, Sequence]:
+    """Return the columns of source_path, reading them from its sidecar cache
+    when it is up to date and otherwise parsing the source with parse and
+    rewriting the cache.
+
+    schema names the layout produced by parse, so that a cache written by an
+    older parser is never reused. The size, modification time and hash of the source
+    are taken before it is parsed, so if it changes while it is parsed, the cache
+    records the old ones and is not trusted for the new contents.
+    """
+    columns = read_cache(source_path, schema)
+    if columns is not None:
+        return columns
+
+    source_stat = os.stat(source_path)
+    digest = source_digest(source_path)
+    columns = parse(source_path)
+    try:
+        write_cache(source_path, columns, schema, source_stat, digest)
+    except OSError:
+        return columns
+
+    return read_cache(source_path, schema) or columns
+
+
+def read_cache(source_path: str, schema: str) -> Optional[Dict[str, Sequence]]:
+    """Return memoryviews over the columns stored in the cache of source_path,
+    or None if there is no valid cache for the current contents of the source.
+
+    If only the modification time of the source changed, the cache is rewritten
+    with the new one. The mapping is closed first, since a mapped file cannot be
+    replaced on Windows, so the columns are copied out of it beforehand, and those
+    copies are returned if the cache cannot be rewritten, e.g. in a read-only
+    directory.
+    """
+    try:
+        with open(cache_path(source_path), 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    header = _read_header(mapped)
+    try:
+        stat = os.stat(source_path)
+    except OSError:
+        header = None
+    if header is None or header['schema'] != schema or header['byteorder'] != sys.byteorder:
+        mapped.close()
+        return None
+
+    if (header['mtime_ns'], header['size']) == (stat.st_mtime_ns, stat.st_size):
+        return _map_columns(mapped, header)
+
+    if header['sha256'] != source_digest(source_path):
+        mapped.close()
+        return None
+
+    columns = _copy_columns(mapped, header)
+    mapped.close()
+    try:
+        write_cache(source_path, columns, schema, stat, header['sha256'])
+    except OSError:
+        return columns
+    return read_cache(source_path, schema) or columns
+
+
+def write_cache(source_path: str, columns: Dict[str, Sequence], schema: str,
+                source_stat: os.stat_result, digest: str) -> None:
+    """Write columns to the cache of source_path, where source_stat and digest are
+    the result of os.stat and source_digest of the source the columns were read from.
+
+    Each column must be an array or a memoryview of a fixed-size numeric type.
+    The cache is written to a temporary file first, so readers never see a
+    partially written cache.
+    """
+    layout = []
+    offset = 0
+    for name, column in columns.items():
+        column = memoryview(column)
+        layout.append([name, column.format, offset, len(column)])
+        offset += _padded(column.nbytes)
+
+    header = json.dumps({'schema': schema,
+                         'byteorder': sys.byteorder,
+                         'mtime_ns': source_stat.st_mtime_ns,
+                         'size': source_stat.st_size,
+                         'sha256': digest,
+                         'columns': layout}).encode()
+    data_start = _padded(len(CACHE_MAGIC) + HEADER_LENGTH.size + len(header))
+
+    temporary_path = cache_path(source_path) + '.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(CACHE_MAGIC + HEADER_LENGTH.pack(len(header)) + header)
+        file.write(bytes(data_start - file.tell()))
+        for column in columns.values():
+            column = memoryview(column)
+            file.write(column.cast('B'))
+            file.write(bytes(_padded(column.nbytes) - column.nbytes))
+    os.replace(temporary_path, cache_path(source_path))
+
+
+def _read_header(mapped: mmap.mmap) -> Optional[dict]:
+    """Return the decoded header of a mapped cache, or None if it is not a cache file.
+    """
+    prefix_length = len(CACHE_MAGIC) + HEADER_LENGTH.size
+    if len(mapped) < prefix_length or mapped[:len(CACHE_MAGIC)] != CACHE_MAGIC:
+        return None
+
+    (header_length,) = HEADER_LENGTH.unpack(mapped[len(CACHE_MAGIC):prefix_length])
+    try:
+        header = json.loads(mapped[prefix_length:prefix_length + header_length])
+    except ValueError:
+        return None
+
+    header['data_start'] = _padded(prefix_length + header_length)
+    return header
+
+
+def _map_columns(mapped: mmap.mmap, header: dict) -> Dict[str, memoryview]:
+    """Return zero-copy memoryviews over every column described by header.
+    """
+    view = memoryview(mapped)
+    columns = {}
+    for name, typecode, offset, length in header['columns']:
+        start = header['data_start'] + offset
+        end = start + length * array(typecode).itemsize
+        columns[name] = view[start:end].cast(typecode)
+    return columns
+
+
+def _copy_columns(mapped: mmap.mmap, header: dict) -> Dict[str, array]:
+    """Return copies of every column described by header, which stay valid after
+    mapped is closed.
+    """
+    columns = {}
+    for name, typecode, offset, length in header['columns']:
+        start = header['data_start'] + offset
+        columns[name] = array(typecode, mapped[start:start + length * array(typecode).itemsize])
+    return columns
+
+
+def _padded(nbytes: int) -> int:
+    """Return nbytes rounded up to a multiple of ALIGNMENT.
+
+    >>> _padded(12)
+    16
+    """
+    return -(-nbytes // ALIGNMENT) * ALIGNMENT
+
+
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-io': ['source_digest', 'read_cache', 'write_cache'],
+        'extra-imports': ['python_ta.contracts', 'hashlib', 'json', 'mmap', 'os', 'struct',
+                          'sys', 'array'],
+        'max-line-length': 100,
+        'max-args': 7,
+        'max-locals': 25,
+        'disable': ['R1705', 'C0200'],
+    })
+
+    import python_ta.contracts
+
+    python_ta.contracts.DEBUG_CONTRACTS = False
+    python_ta.contracts.check_all_contracts()
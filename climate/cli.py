@@ -0,0 +1,375 @@
+""""
+The command line interface of the project: the interactive prompts, and the render,
+animate, grid, report, skill and serve commands
+
+    python -m climate                          the interactive prompts
+    python -m climate render --years 2003-2019 render every map to files
+    python -m climate animate --rcp 'RCP 4.5'  save an animation of every year's maps
+    python -m climate grid --cities all        plot the graphs of many cities in one grid
+    python -m climate report --out report      write a static report of every city and map
+    python -m climate skill --metric rmse      score every RCP type against the actual data
+    python -m climate serve --port 8000        serve maps, series and tables over HTTP
+"""
+import argparse
+import os
+import sys
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from climate.compute import INGEST_WORKERS, build_summary_cube, compute_city_stats, \
+    rcp_to_slice, SummaryCube
+from climate.io import CATALOGUE, DATASETS_DIR, RCP_TYPES, STORE
+from climate.metrics import SKILL_METRICS, best_rcp, cube_skill
+from climate.profiling import PROFILER, stage
+from climate.render import ANIMATION_FRAME_DURATION, GRID_COLUMNS, compose_map, render_all, \
+    render_panel, save_animation, show_cities_grid, show_city_stats
+
+# the public names of this module, which main.py re-exports
+__all__ = ['STAGE_CACHE_SIZE', 'parse_years', 'parse_rcp_types', 'parse_profile_options',
+           'main_command', 'InteractiveSession', 'interactive', 'main']
+
+# how many results of each stage the interactive loop keeps
+STAGE_CACHE_SIZE = 8
+
+
+def parse_years(years: str) -> List[int]:
+    """
+    Returns the years of a comma separated list of years and inclusive year ranges
+
+    >>> parse_years('2003-2005,2010')
+    [2003, 2004, 2005, 2010]
+    """
+    parsed_years = []
+    for part in years.split(','):
+        first, _, last = part.partition('-')
+        parsed_years.extend(range(int(first), int(last or first) + 1))
+    return parsed_years
+
+
+def parse_rcp_types(rcp_types: str) -> List[str]:
+    """
+    Returns the RCP types of a comma separated list such as 'RCP 2.6,RCP 8.5', or of 'all'
+
+    >>> parse_rcp_types('all')
+    ['RCP 2.6', 'RCP 4.5', 'RCP 8.5']
+    """
+    if rcp_types == 'all':
+        return list(RCP_TYPES)
+    parsed_rcp_types = [rcp_type.strip() for rcp_type in rcp_types.split(',')]
+    for rcp_type in parsed_rcp_types:
+        if rcp_type not in RCP_TYPES:
+            raise ValueError('Unknown RCP type: ' + rcp_type)
+    return parsed_rcp_types
+
+
+def parse_profile_options(argv: List[str]) -> List[str]:
+    """
+    Enables the profiler if argv has the --profile or --trace option, and returns the
+    rest of argv. --profile prints a summary of every stage after every iteration, and
+    --trace PATH writes a Chrome trace of every stage to PATH instead. --no-memory
+    leaves out peak memory, which slows down the stages it is traced in. The profiler
+    can also be enabled by setting the CLIMATE_PROFILE environment variable to summary
+    or to the path of a .json trace file
+
+    >>> parse_profile_options(['render', '--years', '2010'])
+    ['render', '--years', '2010']
+    """
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument('--profile', action='store_true')
+    parser.add_argument('--trace', default=None)
+    parser.add_argument('--no-memory', action='store_true')
+    args, rest = parser.parse_known_args(argv)
+    if args.trace is not None:
+        PROFILER.enable(args.trace if args.trace.endswith('.json') else args.trace + '.json',
+                        not args.no_memory)
+    elif args.profile:
+        PROFILER.enable('summary', not args.no_memory)
+    return rest
+
+
+def main_command(argv: List[str]) -> int:
+    """
+    Runs the non-interactive command given by the command line arguments argv
+    """
+    parser = argparse.ArgumentParser(prog='python -m climate')
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = argparse.ArgumentParser(add_help=False)
+    ingest.add_argument('--ingest-workers', type=int, default=INGEST_WORKERS,
+                        help='number of processes parsing the datasets that have no up '
+                             'to date cache (default: %(default)s)')
+
+    render = commands.add_parser('render', parents=[ingest],
+                                 help='render every year and RCP map to files')
+    render.add_argument('--years', default='2003-2019',
+                        help='years to render, e.g. 2003-2019 or 2005,2010')
+    render.add_argument('--rcp', default='all',
+                        help="RCP types to render, e.g. 'RCP 4.5' or all")
+    render.add_argument('--out', default='maps', help='directory to write the maps to')
+    render.add_argument('--format', default='png', choices=['png', 'webp'],
+                        help='image format of the maps')
+    render.add_argument('--workers', type=int, default=None,
+                        help='number of processes rendering the maps (default: one per CPU)')
+
+    animate = commands.add_parser('animate', parents=[ingest],
+                                  help='save an animation of the maps of every year')
+    animate.add_argument('--years', default='2003-2019',
+                         help='years to animate, e.g. 2003-2019 or 2005,2010')
+    animate.add_argument('--rcp', default='RCP 4.5',
+                         help="RCP type of the predicted map, e.g. 'RCP 4.5'")
+    animate.add_argument('--out', default=None,
+                         help='file to save the animation to, ending in .gif, .png, .apng '
+                              'or .webp (default: maps/animation_<rcp>.gif)')
+    animate.add_argument('--duration', type=int, default=ANIMATION_FRAME_DURATION,
+                         help='milliseconds every year is shown for')
+
+    grid = commands.add_parser('grid', parents=[ingest],
+                               help='plot the graphs of many cities in one grid')
+    grid.add_argument('--cities', default='all',
+                      help='comma separated names of the cities to plot, or all')
+    grid.add_argument('--columns', type=int, default=GRID_COLUMNS,
+                      help='number of graphs in every row of the grid')
+
+    report = commands.add_parser('report', parents=[ingest],
+                                 help='write a static HTML report of every city and map')
+    report.add_argument('--years', default='2003-2019',
+                        help='years of the maps, e.g. 2003-2019 or 2005,2010')
+    report.add_argument('--rcp', default='all',
+                        help="RCP types of the maps, e.g. 'RCP 4.5' or all")
+    report.add_argument('--out', default='report', help='directory to write the report to')
+    report.add_argument('--format', default='png', choices=['png', 'webp'],
+                        help='image format of the maps')
+    report.add_argument('--workers', type=int, default=None,
+                        help='number of processes rendering the maps (default: one per CPU)')
+
+    skill = commands.add_parser('skill', parents=[ingest],
+                                help='score the predictions of every city against its '
+                                     'actual temperatures')
+    skill.add_argument('--years', default=None,
+                       help='consecutive years to score, e.g. 2003-2010 (default: every '
+                            'year)')
+    skill.add_argument('--metric', default='rmse', choices=SKILL_METRICS,
+                       help='metric the best matching RCP type of every city is chosen by')
+
+    serve = commands.add_parser('serve', parents=[ingest],
+                                help='serve maps, series and tables over HTTP')
+    serve.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    serve.add_argument('--port', type=int, default=8000, help='port to listen on')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        from climate import server
+
+        server.serve(args.host, args.port, args.ingest_workers)
+        return 0
+
+    STORE.load_directory(DATASETS_DIR, args.ingest_workers)
+    if args.command == 'grid':
+        if args.cities == 'all':
+            cities = CATALOGUE.stations()
+        else:
+            cities = [CATALOGUE.find(name.strip()) for name in args.cities.split(',')]
+            if None in cities:
+                parser.error('unknown city in ' + args.cities)
+        show_cities_grid(cities, args.columns)
+        PROFILER.end_iteration()
+        return 0
+
+    if args.command == 'animate':
+        rcp_types = parse_rcp_types(args.rcp)
+        if len(rcp_types) != 1:
+            parser.error('animate takes exactly one RCP type')
+        rcp_type = rcp_types[0]
+        path = args.out or os.path.join(
+            'maps', 'animation_' + rcp_type.replace(' ', '').replace('.', '').lower() + '.gif')
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        cube = build_summary_cube(CATALOGUE.stations(), args.ingest_workers)
+        save_animation(cube, parse_years(args.years), rcp_type, path, args.duration)
+        print('Saved the animation of ' + rcp_type + ' to ' + path)
+        PROFILER.end_iteration()
+        return 0
+
+    if args.command == 'skill':
+        years = None
+        if args.years:
+            listed_years = sorted(set(parse_years(args.years)))
+            years = range(listed_years[0], listed_years[-1] + 1)
+            if listed_years != list(years):
+                parser.error('skill takes consecutive years, e.g. 2003-2010')
+        cube = build_summary_cube(CATALOGUE.stations(), args.ingest_workers)
+        scores = cube_skill(cube, years)
+        print(f'{"City":<20}{"Best":<10}' + ''.join(f'{rcp_type:>10}' for rcp_type in RCP_TYPES))
+        for city, rcp_scores in scores.items():
+            print(f'{city[3]:<20}{best_rcp(rcp_scores, args.metric) or "-":<10}'
+                  + ''.join(f'{getattr(rcp_scores[rcp_type], args.metric):>10.3f}'
+                            for rcp_type in RCP_TYPES))
+        PROFILER.end_iteration()
+        return 0
+
+    cube = build_summary_cube(CATALOGUE.stations(), args.ingest_workers)
+    if args.command == 'report':
+        from climate.report import write_report
+
+        written = write_report(cube, CATALOGUE.stations(), parse_years(args.years),
+                               parse_rcp_types(args.rcp), args.out, args.format, args.workers)
+        print('Wrote the report of ' + str(written['cities']) + ' cities into '
+              + os.path.join(args.out, 'index.html') + ' (' + str(written['maps'])
+              + ' maps rendered)')
+        PROFILER.end_iteration()
+        return 0
+
+    rendered = render_all(cube, parse_years(args.years), parse_rcp_types(args.rcp),
+                          args.out, args.format, args.workers)
+    print('Rendered ' + str(len(rendered)) + ' maps into ' + args.out)
+    PROFILER.end_iteration()
+    return 0
+
+
+class InteractiveSession:
+    """
+    The state of the interactive loop. Every stage keeps its latest results keyed by
+    its inputs, so a new choice of year, city or RCP only recomputes the stages whose
+    inputs changed: changing the RCP only recolours the predicted map, and changing
+    the year does not plot the graph and table of the selected city again
+
+    Instance Attributes:
+        - cube: the summary cube the maps are coloured from
+        - stages: maps each stage name to its results, least recently used first
+        - shown_city: the city whose graph and table were plotted last
+    """
+    cube: SummaryCube
+    stages: Dict[str, OrderedDict]
+    shown_city: Optional[tuple]
+
+    def __init__(self, cube: SummaryCube) -> None:
+        self.cube = cube
+        self.stages = {}
+        self.shown_city = None
+
+    def stage(self, name: str, inputs: tuple, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the result of stage name for inputs, calling compute only if the
+        result is not cached
+        """
+        results = self.stages.setdefault(name, OrderedDict())
+        if inputs in results:
+            results.move_to_end(inputs)
+        else:
+            results[inputs] = compute()
+            if len(results) > STAGE_CACHE_SIZE:
+                results.popitem(last=False)
+        return results[inputs]
+
+    def update(self, year: int, city_name: str, rcp_type: str) -> None:
+        """
+        Shows the graph and table of the city named city_name if it changed, and the
+        maps of year and rcp_type
+        """
+        city = CATALOGUE.find(city_name)
+        if city is not None and city != self.shown_city:
+            stats = self.stage('city stats', (city,), lambda: compute_city_stats(city))
+            show_city_stats(city, stats)
+            self.shown_city = city
+
+        series = rcp_to_slice(rcp_type)
+        map = self.stage('panel', (year, 0), lambda: render_panel(self.cube, year, 0))
+        map2 = self.stage('panel', (year, series),
+                          lambda: render_panel(self.cube, year, series))
+        new_map = compose_map(map, map2, year)
+        with stage('show'):
+            new_map.show()
+        PROFILER.end_iteration()
+
+
+def interactive() -> None:
+    """
+    Asks for a year, a city and an RCP type, and shows the graph and table of the city
+    and the maps of the year, until the answers are wrong twice
+    """
+    city_names = ', '.join(name.upper() for name in CATALOGUE.names())
+
+    year = input('Write the year for the map to display data from '
+                 '(in range of 2003-2019 inclusive)')
+    if not 2003 <= int(year) <= 2019:
+        year = input('Try again. Write the number between 2003 and 2019 inclusive')
+    city_name = input(
+        'Type the name of the city you want to display its stats on graph'
+        '(' + city_names + ')')
+    if CATALOGUE.find(city_name) is None:
+        city_name = input(
+            'Try again. Type one of ' + city_names)
+    rcp_type = input(
+        'Write an RCP value for the map to display on the "predicted" side.'
+        '(write RCP 2.6 or RCP 4.5 or RCP 8.5)')
+    if rcp_type not in ('RCP 2.6', 'RCP 4.5', 'RCP 8.5'):
+        rcp_type = input('Try again. Write RCP 2.6 or RCP 4.5 or RCP 8.5)')
+
+    STORE.load_directory(DATASETS_DIR, INGEST_WORKERS)
+    session = InteractiveSession(build_summary_cube(CATALOGUE.stations(), INGEST_WORKERS))
+
+    while True:
+        session.update(int(year), city_name, rcp_type)
+
+        year = input('Write the year for the map to display data from '
+                     '(in range of 2003-2019 inclusive). '
+                     'Type 2 wrong answers to exit')
+        if not 2003 <= int(year) <= 2019:
+            year = input('Try again. Write the number between 2003 and 2019 inclusive. '
+                         'Type a wrong aswer to exit')
+        if not 2003 <= int(year) <= 2019:
+            break
+
+        city_name = input(
+            'Type the name of the city you want to display its stats on graph'
+            '(' + city_names + ') Type 2 wrong answers to exit.')
+        if CATALOGUE.find(city_name) is None:
+            city_name = input(
+                'Try again. Type one of ' + city_names + '. '
+                'Type a wrong answer to exit.')
+        if CATALOGUE.find(city_name) is None:
+            break
+
+        rcp_type = input(
+            'Write an RCP value for the map to display on the "predicted" side.'
+            '(write RCP 2.6 or RCP 4.5 or RCP 8.5) Type 2 wrong answers to exit')
+        if rcp_type not in ('RCP 2.6', 'RCP 4.5', 'RCP 8.5'):
+            rcp_type = input('Try again. Write RCP 2.6 or RCP 4.5 or RCP 8.5'
+                             'Type a wrong answer to exit.')
+        if rcp_type not in ('RCP 2.6', 'RCP 4.5', 'RCP 8.5'):
+            break
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the command given by the command line arguments argv, or the interactive
+    prompts if there is none
+    """
+    argv = parse_profile_options(sys.argv[1:] if argv is None else argv)
+    if argv:
+        return main_command(argv)
+    interactive()
+    return 0
+
+
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-io': ['main_command', 'interactive'],
+        'extra-imports': ['python_ta.contracts', 'argparse', 'sys', 'collections',
+                          'climate.compute', 'climate.io', 'climate.profiling',
+                          'climate.render', 'climate.server'],
+        'max-line-length': 100,
+        'max-args': 7,
+        'max-locals': 25,
+        'disable': ['R1705', 'C0200'],
+    })
+
+    import python_ta.contracts
+
+    python_ta.contracts.DEBUG_CONTRACTS = False
+    python_ta.contracts.check_all_contracts()
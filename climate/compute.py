@@ -0,0 +1,423 @@
+""""
+Helper functions responsible for computing on the data
+"""
+
+import math
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from climate.io import RCP_TYPES, STORE, ingest_cities, read_actual_data, read_predicted_data
+from climate.profiling import stage
+
+# the series of a summary cube, in the order used by rcp_to_slice
+SUMMARY_SERIES = ('Actual',) + RCP_TYPES
+
+# actual temperatures closer than this to 0 degrees have no percentage difference
+ZERO_TEMP_TOLERANCE = 0.5
+
+# the most temperatures a colour scale remembers the colour of
+COLOUR_TABLE_SIZE = 1 << 16
+
+# the number of processes parsing the datasets not read before when building the
+# summary cube
+INGEST_WORKERS = 4
+
+
+def extract_rcp_columns(predicted_temps_dict: dict,
+                        names: Sequence[str] = RCP_TYPES) -> Dict[str, List[float]]:
+    """Return a mapping of every series in names to its list of values, in the order
+    of the years of predicted_temps_dict, walking the dictionary only once.
+
+    names may include the uncertainty bands returned by read_predicted_data, such as
+    'RCP 2.6 Range (low)' and 'RCP 2.6 Range (high)'.
+
+    >>> extract_rcp_columns({2003: {'RCP 2.6': 1.0, 'RCP 4.5': 2.0, 'RCP 8.5': 3.0},
+    ...                      2004: {'RCP 2.6': 4.0, 'RCP 4.5': 5.0, 'RCP 8.5': 6.0}})
+    {'RCP 2.6': [1.0, 4.0], 'RCP 4.5': [2.0, 5.0], 'RCP 8.5': [3.0, 6.0]}
+    """
+    columns = {name: [] for name in names}
+
+    for temps in predicted_temps_dict.values():
+        for name, column in columns.items():
+            column.append(temps[name])
+
+    return columns
+
+
+def extract_rcp_matrix(predicted_temps_dict: dict,
+                       names: Sequence[str] = RCP_TYPES) -> List[Tuple[float, ...]]:
+    """Return one row per year of predicted_temps_dict holding the value of every
+    series in names, i.e. a years x scenarios table.
+
+    >>> extract_rcp_matrix({2003: {'RCP 2.6': 1.0, 'RCP 4.5': 2.0, 'RCP 8.5': 3.0}})
+    [(1.0, 2.0, 3.0)]
+    """
+    return [tuple(temps[name] for name in names) for temps in predicted_temps_dict.values()]
+
+
+def extract_rcp_bands(predicted_temps_dict: dict, rcp_type: str) -> Dict[str, List[float]]:
+    """Return the 'Range (low)', 'Median' and 'Range (high)' lists of rcp_type.
+    """
+    columns = extract_rcp_columns(predicted_temps_dict,
+                                  (rcp_type + ' Range (low)', rcp_type,
+                                   rcp_type + ' Range (high)'))
+    return {'Range (low)': columns[rcp_type + ' Range (low)'],
+            'Median': columns[rcp_type],
+            'Range (high)': columns[rcp_type + ' Range (high)']}
+
+
+def make_low_rcp_list(predicted_temps_dict: dict) -> List[float]:
+    """Return a list of RCP 2.6 temperature values
+    """
+    return extract_rcp_columns(predicted_temps_dict, ('RCP 2.6',))['RCP 2.6']
+
+
+def make_median_rcp_list(predicted_temps_dict: dict) -> List[float]:
+    """Return a list of RCP 4.5 temperature values
+    """
+    return extract_rcp_columns(predicted_temps_dict, ('RCP 4.5',))['RCP 4.5']
+
+
+def make_high_rcp_list(predicted_temps_dict: dict) -> List[float]:
+    """Return a list of RCP 8.5 temperature values
+    """
+    return extract_rcp_columns(predicted_temps_dict, ('RCP 8.5',))['RCP 8.5']
+
+
+def calc_all_actual_pd(actual_temps: Any, rcp_lists: Dict[str, Sequence[float]],
+                       tolerance: float = ZERO_TEMP_TOLERANCE) -> Dict[str, List[float]]:
+    """Return a mapping of every RCP type in rcp_lists to its list of percentage
+    differences to the actual temperature values.
+
+    actual_temps is either a dictionary of year to actual temperature or a sequence of
+    actual temperatures, aligned year by year with the lists in rcp_lists as
+    compute_city_stats returns them. Years whose actual temperature is within
+    tolerance of 0 degrees have no meaningful percentage difference and are given nan
+    instead of dividing by a near-zero value.
+
+    The project does not depend on numpy, so this is not a single array operation:
+    the near-zero actual temperatures are masked once for every RCP type, but each
+    difference is still computed and rounded by the interpreter, and the rounding
+    alone is most of the cost. calc_cities_actual_pd is therefore only about 1.1 times
+    faster than the original per-RCP loops (see benchmark.py).
+
+    >>> calc_all_actual_pd({2003: 10.0, 2004: 0.0}, {'RCP 2.6': [11.0, 1.0]})
+    {'RCP 2.6': [10.0, nan]}
+    """
+    if isinstance(actual_temps, dict):
+        actual_temps = actual_temps.values()
+    usable_actual = [temp if abs(temp) >= tolerance else math.nan for temp in actual_temps]
+
+    rcp_pd = {}
+    for rcp_type, rcp_list in rcp_lists.items():
+        rcp_pd[rcp_type] = [round(abs(predicted - actual) / actual * 100, 1)
+                            for predicted, actual in zip(rcp_list, usable_actual)]
+
+    return rcp_pd
+
+
+def calc_cities_actual_pd(city_temps: Dict[Any, Tuple[Any, Dict[str, Sequence[float]]]],
+                          tolerance: float = ZERO_TEMP_TOLERANCE) \
+        -> Dict[Any, Dict[str, List[float]]]:
+    """Return calc_all_actual_pd for every city in city_temps, which maps a city to
+    its actual temperatures and its RCP lists.
+    """
+    return {city: calc_all_actual_pd(actual_temps, rcp_lists, tolerance)
+            for city, (actual_temps, rcp_lists) in city_temps.items()}
+
+
+def calc_low_actual_pd(actual_temps_dict: dict,
+                       final_low_rcp_list: list) -> List[float]:
+    """
+    Return a list of percentage differences of low RCP values to actual temperature values
+    """
+    return calc_all_actual_pd(actual_temps_dict, {'RCP 2.6': final_low_rcp_list})['RCP 2.6']
+
+
+def calc_median_actual_pd(actual_temps_dict: dict,
+                          final_median_rcp_list: list) -> List[float]:
+    """
+    Return a list of percentage differences of median RCP values to actual temperature values
+    """
+    return calc_all_actual_pd(actual_temps_dict, {'RCP 4.5': final_median_rcp_list})['RCP 4.5']
+
+
+def calc_high_actual_pd(actual_temps_dict: dict,
+                        final_high_rcp_list: list) -> List[float]:
+    """
+    Return a list of percentage differences of high RCP values to actual temperature values
+    """
+    return calc_all_actual_pd(actual_temps_dict, {'RCP 8.5': final_high_rcp_list})['RCP 8.5']
+
+
+def rcp_to_slice(rcp_type: str) -> Any:
+    """
+    Returns the index that corresponds to that RCP value
+    """
+    if rcp_type == 'RCP 2.6':
+        return 1
+    elif rcp_type == 'RCP 4.5':
+        return 2
+    elif rcp_type == 'RCP 8.5':
+        return 3
+    else:
+        return None
+
+
+class SummaryCube:
+    """The actual and predicted temperature of every city and year, stored in one
+    flat array so that any (city, year, series) lookup is a single index.
+
+    The series of a city and year are in the order of SUMMARY_SERIES, so
+    rcp_to_slice gives the position of an RCP type. Missing values are nan.
+
+    Instance Attributes:
+        - cities: the cities of the cube, in index order
+        - years: the years of the cube, in index order
+        - values: the temperatures, indexed by city, then year, then series
+
+    Representation Invariants:
+        - len(self.values) == len(self.cities) * len(self.years) * len(SUMMARY_SERIES)
+    """
+    cities: List[Any]
+    years: range
+    values: array
+    _city_index: Dict[Any, int]
+
+    def __init__(self, cities: Iterable[Any], years: range) -> None:
+        self.cities = list(cities)
+        self.years = years
+        self.values = array('d', [math.nan]) * (len(self.cities) * len(years)
+                                                * len(SUMMARY_SERIES))
+        self._city_index = {city: index for index, city in enumerate(self.cities)}
+
+    def offset(self, city: Any, year: int) -> int:
+        """Return the index in values of the first series of city in year.
+        """
+        year_index = year - self.years.start
+        if not 0 <= year_index < len(self.years):
+            raise KeyError(year)
+        return (self._city_index[city] * len(self.years) + year_index) * len(SUMMARY_SERIES)
+
+    def get(self, city: Any, year: int, series: int) -> float:
+        """Return the temperature of city in year for the series at index series
+        of SUMMARY_SERIES.
+        """
+        return self.values[self.offset(city, year) + series]
+
+    def temps(self, city: Any, year: int) -> List[float]:
+        """Return every series of city in year, in the order of SUMMARY_SERIES.
+        """
+        start = self.offset(city, year)
+        return self.values[start:start + len(SUMMARY_SERIES)].tolist()
+
+    def set_temps(self, city: Any, year: int, temps: Sequence[float]) -> None:
+        """Store every series of city in year, given in the order of SUMMARY_SERIES.
+        """
+        start = self.offset(city, year)
+        self.values[start:start + len(SUMMARY_SERIES)] = array('d', temps)
+
+
+def load_city_data(city: tuple) -> Tuple[Dict[int, float], Dict[int, Dict[str, float]]]:
+    """Return the actual and predicted temperatures of city, read from its datasets.
+    """
+    with stage('read'):
+        actual_temps_dict = read_actual_data(city[0])
+        return actual_temps_dict, read_predicted_data(city[1], actual_temps_dict)
+
+
+def build_summary_cube(cities: Iterable[tuple], workers: int = 1) -> SummaryCube:
+    """Return the summary cube of every city, read from the city's actual and
+    predicted datasets and spanning every year with actual data.
+
+    Each city is a tuple whose first two elements are its actual and predicted
+    dataset paths and whose fourth element is its name, like the stations of CATALOGUE.
+    The datasets not read before are parsed by a pool of workers processes (see
+    ingest_cities) and kept in STORE, and the cities are then aggregated in this
+    process, ordered by name, so only this function writes to the cube.
+    """
+    cities = sorted(cities, key=lambda city: (city[3], city[:2]))
+    with stage('ingest'):
+        ingest_cities(cities, workers)
+    city_data = {city: load_city_data(city) for city in cities}
+
+    with stage('aggregate'):
+        all_years = [year for actual_temps_dict, _ in city_data.values()
+                     for year in actual_temps_dict]
+        years = range(min(all_years), max(all_years) + 1) if all_years else range(0)
+        cube = SummaryCube(city_data, years)
+
+        for city, (actual_temps_dict, predicted_temps_dict) in city_data.items():
+            for year, actual_temp in actual_temps_dict.items():
+                predicted_temps = predicted_temps_dict.get(year, {})
+                cube.set_temps(city, year, [actual_temp]
+                               + [predicted_temps.get(rcp_type, math.nan)
+                                  for rcp_type in RCP_TYPES])
+
+    return cube
+
+
+def compute_city_stats(city: tuple) -> Tuple[dict, Dict[str, list], Dict[str, list]]:
+    """Return the actual temperatures, RCP lists and percentage differences of city,
+    in the years that have both an actual and a predicted temperature, so that the
+    actual temperatures and every list are aligned by year.
+    """
+    with stage('read'):
+        all_actual_temps = read_actual_data(city[0])
+        predicted_temps_dict = read_predicted_data(city[1], all_actual_temps)
+        actual_temps_dict = {year: all_actual_temps[year] for year in predicted_temps_dict}
+
+    with stage('extract'):
+        rcp_lists = extract_rcp_columns(predicted_temps_dict)
+    with stage('diff'):
+        return actual_temps_dict, rcp_lists, calc_all_actual_pd(actual_temps_dict, rcp_lists)
+
+
+def json_value(value: float) -> Optional[float]:
+    """Return value, or None if it is nan, which JSON cannot represent.
+
+    >>> json_value(float('nan')) is None
+    True
+    """
+    return None if math.isnan(value) else value
+
+
+def city_series(city: tuple) -> dict:
+    """Return the JSON series of city: its years with a prediction, the number of
+    months of data behind each actual temperature, and its actual temperatures, RCP
+    lists and percentage differences in those years, with nan as None.
+    """
+    actual_temps_dict, rcp_lists, rcp_percentage_difference = compute_city_stats(city)
+    coverage = STORE.yearly_coverage(city[0])
+    return {'name': city[3],
+            'years': list(actual_temps_dict),
+            'months': [coverage[year] for year in actual_temps_dict],
+            'actual': [json_value(temp) for temp in actual_temps_dict.values()],
+            'rcp': {rcp_type: [json_value(temp) for temp in values]
+                    for rcp_type, values in rcp_lists.items()},
+            'difference': {rcp_type: [json_value(pd) for pd in values]
+                           for rcp_type, values in rcp_percentage_difference.items()}}
+
+
+def temp_to_rgb(temp: float) -> Tuple:
+    """
+    Returns the rgb value that corresponds to that temperature
+    """
+    if temp > 20:
+        return (0, 0, 0)
+    elif temp >= 17.3:
+        return (255, 0, int(35.55 * (temp - 17.3)))
+    elif temp >= 5.6:
+        return (255, int(21.79 * (17.3 - temp)), 0)
+    elif temp >= 2.9:
+        return (int(85.19 * (temp - 2.9)), 255, 0)
+    elif temp >= -0.30:
+        return (0, 255, int(79.69 * (2.9 - temp)))
+    else:
+        return (250, 250, 250)
+
+
+class ColourTable(dict):
+    """A mapping of temperature to its rgb value under a colour function, which
+    computes and remembers the colour of a temperature the first time it is looked up.
+
+    nan is never remembered, since every nan is a different key, and no temperature is
+    remembered once the table holds max_size of them.
+
+    Instance Attributes:
+        - colour_function: the function giving the rgb value of a temperature
+        - max_size: the most temperatures the table remembers
+
+    Representation Invariants:
+        - len(self) <= self.max_size
+    """
+    colour_function: Callable[[float], Tuple]
+    max_size: int
+
+    def __init__(self, colour_function: Callable[[float], Tuple], max_size: int) -> None:
+        super().__init__()
+        self.colour_function = colour_function
+        self.max_size = max_size
+
+    def __missing__(self, temp: float) -> Tuple:
+        rgb = tuple(self.colour_function(temp))
+        if temp == temp and len(self) < self.max_size:
+            self[temp] = rgb
+        return rgb
+
+
+class ColourScale:
+    """A colour function together with a table of the rgb values it gave before.
+
+    Temperatures are looked up by their exact value, so every colour is exactly the one
+    the colour function gives. The temperatures of the datasets have two decimals, so a
+    few thousand of them cover every station and year, and mapping a sequence of
+    temperatures is one dictionary lookup per temperature, run by map, instead of a
+    call of the colour function.
+
+    Instance Attributes:
+        - colour_function: the function giving the rgb value of a temperature
+    """
+    colour_function: Callable[[float], Tuple]
+    _table: ColourTable
+
+    def __init__(self, colour_function: Callable[[float], Tuple],
+                 max_size: int = COLOUR_TABLE_SIZE) -> None:
+        self.colour_function = colour_function
+        self._table = ColourTable(colour_function, max_size)
+
+    def rgb(self, temp: float) -> Tuple:
+        """Return the rgb value of temp.
+
+        >>> COLOUR_SCALES['default'].rgb(10.0) == temp_to_rgb(10.0)
+        True
+        """
+        return self._table[temp]
+
+    def rgb_list(self, temps: Iterable[float]) -> List[Tuple]:
+        """Return the rgb value of every temperature in temps.
+        """
+        return list(map(self._table.__getitem__, temps))
+
+
+# the colour scales available to temps_to_rgb, by name
+COLOUR_SCALES = {'default': ColourScale(temp_to_rgb)}
+
+
+def register_colour_scale(name: str, scale: ColourScale) -> None:
+    """Make scale available to temps_to_rgb under name.
+    """
+    COLOUR_SCALES[name] = scale
+
+
+def temps_to_rgb(temps: Iterable[float], scale: str = 'default') -> List[Tuple]:
+    """Return the rgb value of every temperature in temps using the colour scale
+    registered under scale.
+
+    >>> temps_to_rgb([25.0, 10.0, -5.0])
+    [(0, 0, 0), (255, 159, 0), (250, 250, 250)]
+    """
+    return COLOUR_SCALES[scale].rgb_list(temps)
+
+
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-io': [],
+        'extra-imports': ['python_ta.contracts', 'math', 'array', 'climate.io',
+                          'climate.profiling'],
+        'max-line-length': 100,
+        'max-args': 7,
+        'max-locals': 25,
+        'disable': ['R1705', 'C0200'],
+    })
+
+    import python_ta.contracts
+
+    python_ta.contracts.DEBUG_CONTRACTS = False
+    python_ta.contracts.check_all_contracts()
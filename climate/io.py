@@ -0,0 +1,726 @@
+""""
+Helper functions responsible for reading the data from the datasets
+"""
+import csv
+import math
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from climate.cache import load_columns, read_cache
+
+MAP = 'canada_map2.jpg'
+# the temperatures of the last year shown of every city, only written by the run of the
+# project.py compatibility module
+CITY_TEMPS = {}
+
+DATASETS_DIR = 'datasets'
+STATIONS_FILE = os.path.join(DATASETS_DIR, 'stations.csv')
+ACTUAL_SUFFIX = '_actual.csv'
+PREDICTED_SUFFIX = '_predicted.csv'
+RCP_TYPES = ('RCP 2.6', 'RCP 4.5', 'RCP 8.5')
+# maps every predicted series to its CSV column; an RCP type alone names its median
+PREDICTED_COLUMNS = {
+    'RCP 2.6': 2, 'RCP 4.5': 5, 'RCP 8.5': 8,
+    'RCP 2.6 Range (low)': 1, 'RCP 4.5 Range (low)': 4, 'RCP 8.5 Range (low)': 7,
+    'RCP 2.6 Range (high)': 3, 'RCP 4.5 Range (high)': 6, 'RCP 8.5 Range (high)': 9,
+}
+PREDICTED_BASE_YEAR = 2000
+# the meteorological seasons, and the index in SEASONS of the season of every month
+SEASONS = ('DJF', 'MAM', 'JJA', 'SON')
+MONTH_SEASONS = (None, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 0)
+# the fewest months with a mean temperature a year needs for its mean to count as an
+# annual mean, so that a year with only a few winter months is not mistaken for a cold one
+ANNUAL_MIN_MONTHS = 10
+ACTUAL_SCHEMA = 'actual-3'
+PREDICTED_SCHEMA = 'predicted-3'
+
+
+class Station(NamedTuple):
+    """A weather station of the station catalogue.
+
+    The first four fields are in the order of the (actual path, predicted path,
+    map seed, name) city tuples that the rest of the project indexes.
+
+    Instance Attributes:
+        - actual_path: the path of the station's actual dataset
+        - predicted_path: the path of the station's predicted dataset
+        - seed: the pixel of the base map inside the station's region
+        - name: the name of the station's city
+        - station_id: the unique id of the station
+        - province: the code of the station's province
+        - latitude: the latitude of the station
+        - longitude: the longitude of the station
+    """
+    actual_path: str
+    predicted_path: str
+    seed: Tuple[int, int]
+    name: str
+    station_id: str
+    province: str
+    latitude: float
+    longitude: float
+
+
+class StationCatalogue:
+    """The stations listed in a catalogue CSV file, indexed by name and id.
+
+    The file is only read the first time a station is requested. Dataset paths in
+    the file are relative to the directory of the file.
+
+    Instance Attributes:
+        - catalogue_path: the path of the catalogue CSV file
+    """
+    catalogue_path: str
+    _stations: Optional[List[Station]]
+    _index: Dict[str, Station]
+
+    def __init__(self, catalogue_path: str) -> None:
+        self.catalogue_path = catalogue_path
+        self._stations = None
+        self._index = {}
+
+    def stations(self) -> List[Station]:
+        """Return every station of the catalogue, in file order.
+        """
+        if self._stations is None:
+            self._stations = read_station_catalogue(self.catalogue_path)
+            for station in self._stations:
+                self._index[station.station_id.lower()] = station
+                self._index[station.name.lower()] = station
+        return self._stations
+
+    def find(self, name: str) -> Optional[Station]:
+        """Return the station whose name or id is name, ignoring case,
+        or None if there is no such station.
+        """
+        self.stations()
+        return self._index.get(name.strip().lower())
+
+    def names(self) -> List[str]:
+        """Return the city name of every station of the catalogue.
+        """
+        return [station.name for station in self.stations()]
+
+
+def read_station_catalogue(catalogue_path: str) -> List[Station]:
+    """Return the stations of a catalogue CSV file.
+
+    Preconditions:
+        - catalogue_path refers to a csv file in the format of datasets/stations.csv
+    """
+    directory = os.path.dirname(catalogue_path)
+    stations = []
+    with open(catalogue_path) as file:
+        for row in csv.DictReader(file):
+            stations.append(Station(os.path.join(directory, row['ACTUAL_PATH']),
+                                    os.path.join(directory, row['PREDICTED_PATH']),
+                                    (int(row['SEED_X']), int(row['SEED_Y'])),
+                                    row['NAME'],
+                                    row['STATION_ID'],
+                                    row['PROVINCE_CODE'],
+                                    float(row['LATITUDE']),
+                                    float(row['LONGITUDE'])))
+    return stations
+
+
+CATALOGUE = StationCatalogue(STATIONS_FILE)
+
+
+class TemperatureStore:
+    """A columnar store of every parsed actual and predicted dataset.
+
+    Each CSV file is parsed once into compact typed arrays, or mapped from its
+    binary sidecar cache when use_cache is set. Actual datasets are stored as
+    the columns 'year', 'month', 'mean', 'days', 'min' and 'max', one entry per
+    monthly row.
+    Predicted datasets are stored as the column 'year' and one column per series
+    in PREDICTED_COLUMNS, one entry per yearly row.
+
+    Instance Attributes:
+        - use_cache: whether parsed columns are cached next to their CSV files
+        - actual_columns: maps the path of an actual dataset to its columns
+        - predicted_columns: maps the path of a predicted dataset to its columns
+        - cities: maps a lowercase city name to its (actual, predicted) paths
+
+    Representation Invariants:
+        - all(len(set(len(c) for c in cols.values())) == 1
+              for cols in self.actual_columns.values())
+    """
+    use_cache: bool
+    actual_columns: Dict[str, Dict[str, Sequence]]
+    predicted_columns: Dict[str, Dict[str, Sequence]]
+    cities: Dict[str, List[Optional[str]]]
+    _annual: Dict[Tuple[str, bool], Tuple[Dict[int, float], Dict[int, int]]]
+    _seasonal: Dict[str, Dict[str, array]]
+
+    def __init__(self, use_cache: bool = True) -> None:
+        self.use_cache = use_cache
+        self.actual_columns = {}
+        self.predicted_columns = {}
+        self.cities = {}
+        self._annual = {}
+        self._seasonal = {}
+
+    def load_directory(self, directory: str, workers: int = 1) -> None:
+        """Load every actual and predicted dataset in directory into this store,
+        parsing them in workers processes (see ingest).
+        """
+        filenames = sorted(os.listdir(directory))
+        self.ingest([os.path.join(directory, filename) for filename in filenames
+                     if filename.endswith(ACTUAL_SUFFIX)],
+                    [os.path.join(directory, filename) for filename in filenames
+                     if filename.endswith(PREDICTED_SUFFIX)],
+                    workers)
+
+    def ingest(self, actual_paths: Iterable[str], predicted_paths: Iterable[str],
+               workers: int = 1) -> None:
+        """Load every dataset of actual_paths and predicted_paths that is not in this
+        store yet.
+
+        Datasets with an up to date sidecar cache are mapped in this process. With more
+        than one worker, the others are parsed by a pool of that many processes, since
+        parsing a CSV file holds the GIL so threads cannot parse two at once, and the
+        columns they return are installed in this store so no file is parsed again.
+        """
+        cold = {}
+        for paths, predicted in ((actual_paths, False), (predicted_paths, True)):
+            stored = self.predicted_columns if predicted else self.actual_columns
+            schema = PREDICTED_SCHEMA if predicted else ACTUAL_SCHEMA
+            for key in map(os.path.normpath, paths):
+                if key in stored or key in cold:
+                    continue
+                columns = read_cache(key, schema) if self.use_cache else None
+                if columns is None:
+                    cold[key] = predicted
+                else:
+                    self._install(key, predicted, columns)
+
+        if workers > 1 and len(cold) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(cold))) as executor:
+                parsed = executor.map(parse_dataset, cold, cold.values(),
+                                      repeat(self.use_cache))
+                for (key, predicted), columns in zip(cold.items(), parsed):
+                    self._install(key, predicted, columns)
+        else:
+            for key, predicted in cold.items():
+                if predicted:
+                    self.predicted(key)
+                else:
+                    self.actual(key)
+
+    def actual(self, actual_data_filepath: str) -> Dict[str, Sequence]:
+        """Return the columns of the actual dataset at actual_data_filepath,
+        parsing the file only the first time it is requested.
+        """
+        key = os.path.normpath(actual_data_filepath)
+        if key not in self.actual_columns:
+            if self.use_cache:
+                self.actual_columns[key] = load_columns(key, parse_actual_columns,
+                                                        ACTUAL_SCHEMA)
+            else:
+                self.actual_columns[key] = parse_actual_columns(key)
+            self._register_city(key, ACTUAL_SUFFIX, 0)
+        return self.actual_columns[key]
+
+    def predicted(self, predicted_temps_filepath: str) -> Dict[str, Sequence]:
+        """Return the columns of the predicted dataset at predicted_temps_filepath,
+        parsing the file only the first time it is requested.
+        """
+        key = os.path.normpath(predicted_temps_filepath)
+        if key not in self.predicted_columns:
+            if self.use_cache:
+                self.predicted_columns[key] = load_columns(key, parse_predicted_columns,
+                                                           PREDICTED_SCHEMA)
+            else:
+                self.predicted_columns[key] = parse_predicted_columns(key)
+            self._register_city(key, PREDICTED_SUFFIX, 1)
+        return self.predicted_columns[key]
+
+    def predicted_row(self, predicted_temps_filepath: str, year: int) -> Optional[int]:
+        """Return the index of the row of year in the columns of a predicted dataset,
+        or None if the dataset has no prediction for year.
+        """
+        columns = self.predicted(predicted_temps_filepath)
+        years = columns['year']
+        if not years:
+            return None
+        # the years of a predicted dataset are consecutive
+        index = year - years[0]
+        return index if 0 <= index < len(years) else None
+
+    def yearly_means(self, actual_data_filepath: str, weighted: bool = False,
+                     min_months: int = ANNUAL_MIN_MONTHS) -> Dict[int, float]:
+        """Return the mapping of year to mean temperature of an actual dataset, for
+        every year with at least min_months months with a mean temperature.
+
+        See stream_annual_means for the meaning of weighted.
+
+        Preconditions:
+            - 1 <= min_months <= 12
+        """
+        yearly_dict, coverage = self._annual_summary(actual_data_filepath, weighted)
+        return {year: mean_temp for year, mean_temp in yearly_dict.items()
+                if coverage[year] >= min_months}
+
+    def yearly_coverage(self, actual_data_filepath: str) -> Dict[int, int]:
+        """Return the mapping of year to the number of months with a mean temperature
+        in an actual dataset, including the years too sparse for yearly_means.
+        """
+        return self._annual_summary(actual_data_filepath, False)[1]
+
+    def seasonal(self, actual_data_filepath: str) -> Dict[str, array]:
+        """Return the seasonal columns of an actual dataset, as computed by
+        seasonal_columns, aggregating its monthly columns only the first time they
+        are requested.
+        """
+        key = os.path.normpath(actual_data_filepath)
+        if key not in self._seasonal:
+            self._seasonal[key] = seasonal_columns(self.actual(key))
+        return self._seasonal[key]
+
+    def _annual_summary(self, actual_data_filepath: str, weighted: bool) \
+            -> Tuple[Dict[int, float], Dict[int, int]]:
+        """Return the yearly means and yearly coverage of an actual dataset,
+        aggregating its monthly rows only the first time they are requested.
+
+        Without a cache, a dataset whose columns are not in this store is aggregated
+        straight from its file by stream_actual_data, so only its yearly results are
+        kept and thousands of stations can be read in constant memory per station.
+        """
+        key = (os.path.normpath(actual_data_filepath), weighted)
+        if key not in self._annual:
+            if self.use_cache or key[0] in self.actual_columns:
+                columns = self.actual(key[0])
+                annual_means = stream_annual_means(zip(columns['year'], columns['month'],
+                                                       columns['mean'], columns['days']),
+                                                   weighted)
+            else:
+                annual_means = stream_actual_data(key[0], weighted)
+            yearly_dict = {}
+            coverage = {}
+            for year, mean_temp, months in annual_means:
+                yearly_dict[year] = round(mean_temp, 2)
+                coverage[year] = months
+            self._annual[key] = (yearly_dict, coverage)
+        return self._annual[key]
+
+    def _install(self, key: str, predicted: bool, columns: Dict[str, Sequence]) -> None:
+        """Store columns as those of the predicted dataset at key if predicted is True,
+        and of the actual dataset at key otherwise.
+        """
+        if predicted:
+            self.predicted_columns[key] = columns
+            self._register_city(key, PREDICTED_SUFFIX, 1)
+        else:
+            self.actual_columns[key] = columns
+            self._register_city(key, ACTUAL_SUFFIX, 0)
+
+    def _register_city(self, path: str, suffix: str, slot: int) -> None:
+        """Record path as the actual (slot 0) or predicted (slot 1) dataset of its city.
+        """
+        name = os.path.basename(path)[:-len(suffix)].lower()
+        self.cities.setdefault(name, [None, None])[slot] = path
+
+
+def stream_annual_means(rows: Iterable[Tuple[int, int, float, float]],
+                        weighted: bool = False) -> Iterator[Tuple[int, float, int]]:
+    """Yield the year, mean temperature and number of months with a mean temperature
+    of every year in rows, in one pass that only keeps running sums for the current year.
+
+    Each row is a (year, month, mean temperature, days with a valid mean temperature)
+    tuple. Months whose mean temperature is nan are skipped and a repeated month of a
+    year is only counted once. If weighted is True, every month is weighted by its days
+    with a valid mean temperature instead of counting equally. Years with no mean
+    temperature at all are not yielded.
+
+    Preconditions:
+        - all the rows of a year are consecutive
+
+    >>> rows = [(2003, 1, 1.0, 31), (2003, 2, 4.0, 28), (2004, 1, math.nan, 0)]
+    >>> list(stream_annual_means(rows))
+    [(2003, 2.5, 2)]
+    >>> [(year, round(mean, 3)) for year, mean, _ in stream_annual_means(rows, True)]
+    [(2003, 2.424)]
+    """
+    current_year = None
+    seen_months = 0
+    sum_so_far = 0.0
+    weight_so_far = 0.0
+    months = 0
+
+    for year, month, mean_temp, days in rows:
+        if year != current_year:
+            if weight_so_far:
+                yield current_year, sum_so_far / weight_so_far, months
+            current_year = year
+            seen_months = sum_so_far = weight_so_far = months = 0
+
+        if math.isnan(mean_temp) or seen_months & (1 << month):
+            continue
+        weight = days if weighted else 1
+        seen_months |= 1 << month
+        sum_so_far += mean_temp * weight
+        weight_so_far += weight
+        months += 1
+
+    if weight_so_far:
+        yield current_year, sum_so_far / weight_so_far, months
+
+
+def seasonal_columns(columns: Dict[str, Sequence]) -> Dict[str, array]:
+    """Return the columns of every season of the monthly columns of an actual dataset,
+    in one pass over them.
+
+    The returned columns are 'year' and 'season', the index of the season in SEASONS,
+    followed by the 'mean' of the monthly mean temperatures of the season, the number
+    of 'months' with a mean temperature, and the lowest 'min' and highest 'max'
+    temperatures of the season, one entry per season in the order they first appear.
+    December counts towards the DJF season of the following year. Missing temperatures
+    are skipped and a repeated month of a season is only counted once; a season with no
+    temperature at all has nan values.
+
+    >>> columns = {'year': [2003, 2003, 2003, 2004], 'month': [1, 2, 12, 1],
+    ...            'mean': [-6.0, -8.0, -2.0, math.nan],
+    ...            'min': [-20.0, -25.0, -15.0, -30.0], 'max': [5.0, 4.0, 8.0, 2.0]}
+    >>> seasons = seasonal_columns(columns)
+    >>> list(seasons['year']), list(seasons['season']), list(seasons['mean'])
+    ([2003, 2004], [0, 0], [-7.0, -2.0])
+    >>> list(seasons['months']), list(seasons['min']), list(seasons['max'])
+    ([2, 1], [-25.0, -30.0], [5.0, 8.0])
+    """
+    rows = {}
+    seen_months = []
+    years = array('i')
+    seasons = array('b')
+    sums = array('d')
+    months = array('b')
+    lows = array('d')
+    highs = array('d')
+
+    for year, month, mean_temp, low, high in zip(columns['year'], columns['month'],
+                                                 columns['mean'], columns['min'],
+                                                 columns['max']):
+        season = MONTH_SEASONS[month]
+        key = (year + 1 if month == 12 else year, season)
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = len(years)
+            seen_months.append(0)
+            years.append(key[0])
+            seasons.append(season)
+            sums.append(0.0)
+            months.append(0)
+            lows.append(math.nan)
+            highs.append(math.nan)
+
+        if seen_months[row] & (1 << month):
+            continue
+        seen_months[row] |= 1 << month
+        if not math.isnan(mean_temp):
+            sums[row] += mean_temp
+            months[row] += 1
+        if low < lows[row] or math.isnan(lows[row]):
+            lows[row] = low
+        if high > highs[row] or math.isnan(highs[row]):
+            highs[row] = high
+
+    means = array('d', [total / count if count else math.nan
+                        for total, count in zip(sums, months)])
+    return {'year': years, 'season': seasons, 'mean': means, 'months': months,
+            'min': lows, 'max': highs}
+
+
+def stream_actual_data(actual_data_filepath: str,
+                       weighted: bool = False) -> Iterator[Tuple[int, float, int]]:
+    """Yield the year, mean temperature and number of months with a mean temperature
+    of every year of an actual dataset, reading the file row by row without storing it.
+
+    See stream_annual_means for the meaning of weighted.
+
+    Preconditions:
+        - filepath refers to a csv file in the format of
+          datasets/toronto.actual_temps.csv
+          (i.e., could be that file or a different file in the same format)
+    """
+    with open(actual_data_filepath) as file:
+        reader = csv.reader(file)
+
+        next(reader)
+
+        yield from stream_annual_means(((int(row[2]), int(row[3]),
+                                         float(row[4]) if row[4] else math.nan,
+                                         int(row[5] or 0)) for row in reader), weighted)
+
+
+def parse_actual_columns(actual_data_filepath: str) -> Dict[str, array]:
+    """Return the 'year', 'month', 'mean', 'days', 'min' and 'max' columns of an
+    actual dataset, where 'days' holds the days with a valid mean temperature of each
+    month, and 'min' and 'max' hold the lowest and highest temperatures of the month.
+
+    Missing temperatures are stored as nan.
+
+    Preconditions:
+        - filepath refers to a csv file in the format of
+          datasets/toronto.actual_temps.csv
+          (i.e., could be that file or a different file in the same format)
+    """
+    years = array('i')
+    months = array('i')
+    means = array('d')
+    days = array('i')
+    min_temps = array('d')
+    max_temps = array('d')
+    with open(actual_data_filepath) as file:
+        reader = csv.reader(file)
+
+        next(reader)
+
+        for row in reader:
+            years.append(int(row[2]))
+            months.append(int(row[3]))
+            means.append(float(row[4]) if row[4] else math.nan)
+            days.append(int(row[5] or 0))
+            min_temps.append(float(row[6]) if len(row) > 6 and row[6] else math.nan)
+            max_temps.append(float(row[7]) if len(row) > 7 and row[7] else math.nan)
+
+    return {'year': years, 'month': months, 'mean': means, 'days': days,
+            'min': min_temps, 'max': max_temps}
+
+
+def predicted_year(date: str, previous_year: Optional[int]) -> Optional[int]:
+    """Return the year of a date of a predicted dataset, in DD-MM-YY format, given the
+    year of the previous row, or None if the date does not follow the previous year.
+
+    The first two digit year is in the century of PREDICTED_BASE_YEAR, and a year
+    ending in 00 that follows a year ending in 99 starts the next century. Any other
+    date that does not follow the previous year ends the series, e.g. the second
+    block of datasets/edmonton_predicted.csv that starts again at 1950. Datasets that
+    really start in another century are moved there by predicted_century_shift.
+
+    >>> predicted_year('01-01-03', None)
+    2003
+    >>> predicted_year('01-01-00', 2099)
+    2100
+    >>> predicted_year('01-01-50', 2099) is None
+    True
+    """
+    two_digit_year = int(date[-2:])
+    if previous_year is None:
+        return PREDICTED_BASE_YEAR // 100 * 100 + two_digit_year
+
+    year = previous_year + 1
+    return year if year % 100 == two_digit_year else None
+
+
+def predicted_century_shift(predicted_years: Sequence[int],
+                            actual_years: Iterable[int]) -> int:
+    """Return the multiple of 100 years to add to the years of a predicted dataset, as
+    read by predicted_year, so that they cover the most of actual_years.
+
+    The dates of predicted datasets only have two digit years, so the century of a
+    dataset is taken from the actual years it is matched with, preferring the century
+    of PREDICTED_BASE_YEAR when several cover as many of them.
+
+    >>> predicted_century_shift(range(2050, 2100), [1998, 1999, 2000, 2001])
+    -100
+    >>> predicted_century_shift(range(2000, 2050), [1998, 1999, 2000, 2001])
+    0
+    """
+    if not predicted_years:
+        return 0
+    first_year = predicted_years[0]
+    last_year = predicted_years[-1]
+    covered = {}
+    for year in actual_years:
+        lowest_shift = -((last_year - year) // 100) * 100
+        for shift in range(lowest_shift, year - first_year + 1, 100):
+            covered[shift] = covered.get(shift, 0) + 1
+    return max(covered, key=lambda shift: (covered[shift], -abs(shift)), default=0)
+
+
+def stream_predicted_data(predicted_temps_filepath: str,
+                          actual_years: Iterable[int]) -> Dict[int, Dict[str, float]]:
+    """Return a dictionary of every year of actual_years with a prediction to every
+    series in PREDICTED_COLUMNS in that year, reading a predicted dataset row by row
+    without storing it.
+
+    The years of the dataset are moved to the century predicted_century_shift would
+    choose. Only the values of rows that can match one of actual_years are parsed,
+    and the file is closed as soon as the dataset's own century has covered every
+    year of actual_years, since no other century can then be preferred.
+
+    Preconditions:
+        - filepath refers to a csv file in the format of
+          datasets/toronto.predicted_temps.csv
+          (i.e., could be that file or a different file in the same format)
+    """
+    years_by_ending = {}
+    for actual_year in set(actual_years):
+        years_by_ending.setdefault(actual_year % 100, []).append(actual_year)
+    wanted = sum(map(len, years_by_ending.values()))
+    # the rows matching actual_years by the multiple of 100 years they are moved by
+    rows_by_shift = {}
+
+    with open(predicted_temps_filepath) as file:
+        reader = csv.reader(file)
+
+        next(reader)
+
+        year = None
+        for row in reader:
+            year = predicted_year(row[0], year)
+            if year is None or len(rows_by_shift.get(0, ())) == wanted:
+                break
+            for actual_year in years_by_ending.get(year % 100, ()):
+                rows_by_shift.setdefault(actual_year - year, {})[actual_year] = \
+                    {name: float(row[column]) for name, column in PREDICTED_COLUMNS.items()}
+
+    shift = max(rows_by_shift, key=lambda shift: (len(rows_by_shift[shift]), -abs(shift)),
+                default=None)
+    return rows_by_shift.get(shift, {})
+
+
+def parse_predicted_columns(predicted_temps_filepath: str) -> Dict[str, array]:
+    """Return the 'year' column and the column of every series in PREDICTED_COLUMNS
+    of a predicted dataset.
+
+    The year of each row is read from its date by predicted_year, and parsing stops
+    where the dates stop being consecutive years.
+
+    Preconditions:
+        - filepath refers to a csv file in the format of
+          datasets/toronto.predicted_temps.csv
+          (i.e., could be that file or a different file in the same format)
+    """
+    columns = {'year': array('i')}
+    for name in PREDICTED_COLUMNS:
+        columns[name] = array('d')
+
+    with open(predicted_temps_filepath) as file:
+        reader = csv.reader(file)
+
+        next(reader)
+
+        year = None
+        for row in reader:
+            year = predicted_year(row[0], year)
+            if year is None:
+                break
+            columns['year'].append(year)
+            for name, column in PREDICTED_COLUMNS.items():
+                columns[name].append(float(row[column]))
+
+    return columns
+
+
+def parse_dataset(path: str, predicted: bool, use_cache: bool) -> Dict[str, array]:
+    """Return the columns of the predicted dataset at path if predicted is True, or of
+    the actual dataset at path otherwise, refreshing its sidecar cache if use_cache is
+    set.
+
+    This is the work the processes of TemperatureStore.ingest do, so the columns are
+    returned as arrays, which unlike memoryviews over a cache can be sent back.
+    """
+    parse = parse_predicted_columns if predicted else parse_actual_columns
+    if not use_cache:
+        return parse(path)
+
+    columns = load_columns(path, parse, PREDICTED_SCHEMA if predicted else ACTUAL_SCHEMA)
+    return {name: array(memoryview(column).format, memoryview(column).tobytes())
+            for name, column in columns.items()}
+
+
+STORE = TemperatureStore()
+
+
+def ingest_cities(cities: Iterable[tuple], workers: int = 1) -> None:
+    """Load the actual and predicted datasets of every city into STORE, parsing them
+    in workers processes (see TemperatureStore.ingest).
+
+    Each city is a tuple whose first two elements are its actual and predicted dataset
+    paths, like the stations of CATALOGUE.
+    """
+    cities = list(cities)
+    STORE.ingest([city[0] for city in cities], [city[1] for city in cities], workers)
+
+
+def read_actual_data(actual_data_filepath: str, weighted: bool = False,
+                     min_months: int = ANNUAL_MIN_MONTHS) -> Dict[int, float]:
+    """Return a dictionary mapping of year to temperature from the data in a CSV file.
+
+    Each year's temperature is the mean of its months that have a mean temperature,
+    weighted by their days with a valid mean temperature if weighted is True.
+    Years with fewer than min_months such months are left out (see
+    STORE.yearly_coverage for the months of every year).
+    The file is parsed into STORE the first time it is read.
+
+    Preconditions:
+        - filepath refers to a csv file in the format of
+          datasets/toronto.actual_temps.csv
+          (i.e., could be that file or a different file in the same format)
+        - 1 <= min_months <= 12
+    """
+    return STORE.yearly_means(actual_data_filepath, weighted, min_months)
+
+
+def read_predicted_data(predicted_temps_filepath: str,
+                        actual_temps_dict: dict) -> Dict[int, Dict[str, float]]:
+    """Return a dictionary of year to a dictionary of varying RCPs
+        and their respective predicted temperature from the data in a CSV file.
+
+    Each RCP type maps to its median; the '<RCP type> Range (low)' and
+    '<RCP type> Range (high)' keys hold the bounds of its uncertainty band.
+    Only the years of actual_temps_dict are returned, each matched to the row with the
+    same date, in the century given by predicted_century_shift; years with no
+    prediction are left out.
+    The file is parsed into STORE the first time it is read, unless STORE has no
+    cache and does not hold the file yet, in which case only the rows of the years
+    of actual_temps_dict are read by stream_predicted_data.
+
+    Preconditions:
+        - filepath refers to a csv file in the format of
+          datasets/toronto.predicted_temps.csv
+          (i.e., could be that file or a different file in the same format)
+    """
+    key = os.path.normpath(predicted_temps_filepath)
+    if not STORE.use_cache and key not in STORE.predicted_columns:
+        rows = stream_predicted_data(key, actual_temps_dict)
+        return {year: rows[year] for year in actual_temps_dict if year in rows}
+
+    columns = STORE.predicted(predicted_temps_filepath)
+    shift = predicted_century_shift(columns['year'], actual_temps_dict)
+    rcp_dict = {}
+
+    for year in actual_temps_dict:
+        row = STORE.predicted_row(predicted_temps_filepath, year - shift)
+        if row is not None:
+            rcp_dict[year] = {name: columns[name][row] for name in PREDICTED_COLUMNS}
+
+    return rcp_dict
+
+
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-io': ['read_station_catalogue', 'stream_actual_data', 'parse_actual_columns',
+                       'stream_predicted_data', 'parse_predicted_columns'],
+        'extra-imports': ['python_ta.contracts', 'csv', 'math', 'os', 'array',
+                          'concurrent.futures', 'itertools', 'climate.cache'],
+        'max-line-length': 100,
+        'max-args': 7,
+        'max-locals': 25,
+        'disable': ['R1705', 'C0200'],
+    })
+
+    import python_ta.contracts
+
+    python_ta.contracts.DEBUG_CONTRACTS = False
+    python_ta.contracts.check_all_contracts()
@@ -0,0 +1,218 @@
+""""
+Forecast skill metrics of the predicted temperatures against the actual ones
+
+Unlike the percentage differences of climate.compute, which are unstable for actual
+temperatures near 0 degrees, these metrics are in degrees Celsius:
+
+    - rmse: the root mean square error of the predictions
+    - mae: the mean absolute error of the predictions
+    - bias: the mean error of the predictions, positive when they are too warm
+    - correlation: the Pearson correlation of the predictions with the actual
+      temperatures, nan when either series is constant
+    - count: the number of years with both an actual and a predicted temperature
+
+Years missing from either series are left out. cube_skill scores every city and RCP
+type of a SummaryCube in one batch by slicing the cube's flat array, so ranking the
+scenarios of hundreds of stations takes milliseconds.
+"""
+import math
+from array import array
+from itertools import compress
+from operator import sub
+from typing import Any, Dict, NamedTuple, Optional, Sequence
+
+from climate.compute import SUMMARY_SERIES, rcp_to_slice, SummaryCube
+from climate.io import RCP_TYPES
+from climate.profiling import stage
+
+SKILL_METRICS = ('rmse', 'mae', 'bias', 'correlation')
+# variances this small relative to the sum of squares of a series are rounding errors of
+# a constant series, which has no correlation
+VARIANCE_TOLERANCE = 1e-12
+
+
+class SkillScores(NamedTuple):
+    """The skill of one series of predicted temperatures against the actual ones.
+
+    Instance Attributes:
+        - rmse: the root mean square error, in degrees Celsius
+        - mae: the mean absolute error, in degrees Celsius
+        - bias: the mean of the predicted minus the actual temperatures
+        - correlation: the Pearson correlation of the predicted and actual temperatures
+        - count: the number of years scored
+
+    Representation Invariants:
+        - self.count >= 0
+        - self.count > 0 or math.isnan(self.rmse)
+    """
+    rmse: float
+    mae: float
+    bias: float
+    correlation: float
+    count: int
+
+
+def skill_scores(actual_temps: Sequence[float],
+                 predicted_temps: Sequence[float]) -> SkillScores:
+    """Return the skill scores of predicted_temps against actual_temps, which are
+    aligned by year. Years where either temperature is nan are left out.
+
+    >>> scores = skill_scores([1.0, 2.0, 3.0, float('nan')], [2.0, 3.0, 5.0, 1.0])
+    >>> [round(score, 4) for score in scores]
+    [1.4142, 1.3333, 1.3333, 0.982, 3]
+    """
+    return paired_scores(actual_temps, predicted_temps, sum(actual_temps),
+                         math.hypot(*actual_temps) ** 2)
+
+
+def paired_scores(actual_temps: Sequence[float], predicted_temps: Sequence[float],
+                  actual_sum: float, actual_squares: float) -> SkillScores:
+    """Return the skill scores of predicted_temps against actual_temps like
+    skill_scores, given the sum and the sum of squares of actual_temps, so that the
+    actual temperatures of a city are only summed once for all of its RCP types.
+
+    Every sum is one pass of a builtin over the series: the sum of squared errors is
+    the squared distance between the series, and the sum of products of the series
+    follows from it and their sums of squares.
+    """
+    predicted_sum = sum(predicted_temps)
+    if math.isnan(actual_sum) or math.isnan(predicted_sum):
+        valid = [actual == actual and predicted == predicted
+                 for actual, predicted in zip(actual_temps, predicted_temps)]
+        actual_temps = list(compress(actual_temps, valid))
+        predicted_temps = list(compress(predicted_temps, valid))
+        actual_sum = sum(actual_temps)
+        actual_squares = math.hypot(*actual_temps) ** 2
+        predicted_sum = sum(predicted_temps)
+
+    count = len(actual_temps)
+    if count == 0:
+        return SkillScores(math.nan, math.nan, math.nan, math.nan, 0)
+
+    squared_errors = math.dist(predicted_temps, actual_temps) ** 2
+    rmse = math.sqrt(squared_errors / count)
+    mae = sum(map(abs, map(sub, predicted_temps, actual_temps))) / count
+    bias = (predicted_sum - actual_sum) / count
+
+    predicted_squares = math.hypot(*predicted_temps) ** 2
+    products = (actual_squares + predicted_squares - squared_errors) / 2
+    actual_variance = actual_squares - actual_sum * actual_sum / count
+    predicted_variance = predicted_squares - predicted_sum * predicted_sum / count
+    covariance = products - actual_sum * predicted_sum / count
+    if actual_variance <= VARIANCE_TOLERANCE * actual_squares \
+            or predicted_variance <= VARIANCE_TOLERANCE * predicted_squares:
+        correlation = math.nan
+    else:
+        correlation = covariance / math.sqrt(actual_variance * predicted_variance)
+    return SkillScores(rmse, mae, bias, correlation, count)
+
+
+def year_window(cube: SummaryCube, years: Optional[range] = None) -> range:
+    """Return the years of years that are in cube, or every year of cube if years is
+    None.
+
+    Preconditions:
+        - years is None or years.step == 1
+    """
+    if years is None:
+        return cube.years
+    return range(max(years.start, cube.years.start), min(years.stop, cube.years.stop))
+
+
+def cube_skill(cube: SummaryCube, years: Optional[range] = None,
+               rcp_types: Sequence[str] = RCP_TYPES) -> Dict[Any, Dict[str, SkillScores]]:
+    """Return a mapping of every city of cube to the skill scores of each of rcp_types
+    over years, or over every year of cube if years is None.
+
+    Each series of a city is one strided slice of the cube's array, so no value is
+    looked up on its own. The years a city has no actual temperature for are found and
+    left out once for all of its RCP types, as are the sums of its actual temperatures.
+
+    Preconditions:
+        - years is None or years.step == 1
+        - all(rcp_type in RCP_TYPES for rcp_type in rcp_types)
+    """
+    window = year_window(cube, years)
+    width = len(SUMMARY_SERIES)
+    scores = {}
+    with stage('skill'):
+        for city in cube.cities:
+            if window:
+                start = cube.offset(city, window.start)
+                block = cube.values[start:start + len(window) * width]
+            else:
+                block = array('d')
+            actual_temps = block[0::width]
+            actual_sum = sum(actual_temps)
+            valid = None
+            if math.isnan(actual_sum):
+                valid = [actual == actual for actual in actual_temps]
+                actual_temps = array('d', compress(actual_temps, valid))
+                actual_sum = sum(actual_temps)
+            actual_squares = math.hypot(*actual_temps) ** 2
+
+            scores[city] = {}
+            for rcp_type in rcp_types:
+                predicted_temps = block[rcp_to_slice(rcp_type)::width]
+                if valid is not None:
+                    predicted_temps = array('d', compress(predicted_temps, valid))
+                scores[city][rcp_type] = paired_scores(actual_temps, predicted_temps,
+                                                       actual_sum, actual_squares)
+    return scores
+
+
+def best_rcp(rcp_scores: Dict[str, SkillScores], metric: str = 'rmse') -> Optional[str]:
+    """Return the RCP type of rcp_scores whose predictions match the actual temperatures
+    best by metric, or None if none of them could be scored. The lowest rmse, mae or
+    absolute bias is best, and the highest correlation is best.
+
+    >>> best_rcp({'RCP 2.6': SkillScores(0.5, 0.4, -0.1, 0.9, 10),
+    ...           'RCP 8.5': SkillScores(0.7, 0.6, 0.05, 0.95, 10)}, 'bias')
+    'RCP 8.5'
+
+    Preconditions:
+        - metric in SKILL_METRICS
+    """
+    candidates = {rcp_type: getattr(scores, metric) for rcp_type, scores in rcp_scores.items()
+                  if not math.isnan(getattr(scores, metric))}
+    if not candidates:
+        return None
+    if metric == 'correlation':
+        return max(candidates, key=candidates.get)
+    return min(candidates, key=lambda rcp_type: abs(candidates[rcp_type]))
+
+
+def rank_scenarios(cube: SummaryCube, years: Optional[range] = None,
+                   metric: str = 'rmse') -> Dict[Any, Optional[str]]:
+    """Return a mapping of every city of cube to its best matching RCP type by metric
+    over years, or over every year of cube if years is None.
+
+    Preconditions:
+        - years is None or years.step == 1
+        - metric in SKILL_METRICS
+    """
+    return {city: best_rcp(rcp_scores, metric)
+            for city, rcp_scores in cube_skill(cube, years).items()}
+
+
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-io': [],
+        'extra-imports': ['python_ta.contracts', 'math', 'array', 'itertools', 'operator',
+                          'climate.compute', 'climate.io', 'climate.profiling'],
+        'max-line-length': 100,
+        'max-args': 6,
+        'max-locals': 25,
+        'disable': ['R1705', 'C0200'],
+    })
+
+    import python_ta.contracts
+
+    python_ta.contracts.DEBUG_CONTRACTS = False
+    python_ta.contracts.check_all_contracts()
@@ -0,0 +1,311 @@
+""""
+Opt-in timing and memory instrumentation of the stages of the project
+
+Every stage of the pipeline (ingest, read, aggregate, extract, diff, plot, table,
+floodfill, paste, font and show) runs inside stage(name). Instrumentation is off by
+default, and a disabled stage costs a single attribute check. It is turned on by the
+CLIMATE_PROFILE environment variable or the --profile and --trace options of main:
+
+    python main.py --profile                   print a summary after every iteration
+    python -m main --trace trace.json render   write a Chrome trace to trace.json
+    CLIMATE_PROFILE=trace.json python main.py  the same, from the environment
+
+For every stage the profiler records the wall time, the number of calls and the peak
+memory allocated by Python while the stage ran (memory allocated directly by Pillow
+is not traced). tracemalloc keeps a single peak for the whole process, so only stages
+run on the main thread record their peak memory; stages run by other threads, such as
+the request handlers of the server, record a peak of 0. A trace file can be opened in
+chrome://tracing or ui.perfetto.dev.
+Tracing memory slows down stages that allocate many Python objects, such as the pure
+Python flood fill of Pillow, several times over; setting CLIMATE_PROFILE_MEMORY=0 or
+passing --no-memory records undistorted wall times without peak memory.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+PROFILE_ENV = 'CLIMATE_PROFILE'
+PROFILE_MEMORY_ENV = 'CLIMATE_PROFILE_MEMORY'
+STAGE_NAMES = ('ingest', 'read', 'aggregate', 'extract', 'diff', 'plot', 'table', 'floodfill',
+               'paste', 'font', 'show')
+
+
+class StageStats:
+    """The calls, wall time and peak memory of one stage.
+
+    Instance Attributes:
+        - calls: how many times the stage ran
+        - seconds: the total wall time of the stage
+        - peak_bytes: the most memory one run of the stage allocated at once
+
+    Representation Invariants:
+        - self.calls >= 0
+        - self.seconds >= 0.0
+        - self.peak_bytes >= 0
+    """
+    calls: int
+    seconds: float
+    peak_bytes: int
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+        self.peak_bytes = 0
+
+
+class Stage:
+    """A context manager timing one run of a stage for a profiler.
+
+    The peak memory of the run is only traced on the main thread, since resetting the
+    peak of tracemalloc in one thread would spoil the peaks of stages running in others.
+
+    Instance Attributes:
+        - profiler: the profiler the run is recorded by
+        - name: the name of the stage
+    """
+    profiler: 'StageProfiler'
+    name: str
+    _start: float
+    _start_memory: int
+    _peak: int
+    _traced: bool
+
+    def __init__(self, profiler: 'StageProfiler', name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self._start = 0.0
+        self._start_memory = 0
+        self._peak = 0
+        self._traced = False
+
+    def __enter__(self) -> 'Stage':
+        stack = self.profiler.stack()
+        self._traced = self.profiler.memory \
+            and threading.current_thread() is threading.main_thread()
+        if self._traced:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # the peak is about to be reset, so the enclosing stage keeps it first
+                stack[-1].record_peak(peak)
+            tracemalloc.reset_peak()
+            self._start_memory = current
+            self._peak = current
+        stack.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        end = time.perf_counter()
+        if self._traced:
+            self.record_peak(tracemalloc.get_traced_memory()[1])
+        stack = self.profiler.stack()
+        stack.pop()
+        if stack:
+            stack[-1].record_peak(self._peak)
+        self.profiler.record(self.name, self._start, end, self._peak - self._start_memory)
+
+    def record_peak(self, peak: int) -> None:
+        """Raise the peak memory of this run to peak if it is higher.
+        """
+        self._peak = max(self._peak, peak)
+
+
+class DisabledStage:
+    """A context manager that records nothing, used while profiling is off.
+    """
+
+    def __enter__(self) -> 'DisabledStage':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+
+DISABLED_STAGE = DisabledStage()
+
+
+class StageProfiler:
+    """Records the stages run while it is enabled, and reports them either as a summary
+    printed after every iteration or as a Chrome trace file.
+
+    Instance Attributes:
+        - enabled: whether stages are recorded
+        - memory: whether the peak memory of stages is traced
+        - trace_path: the file the Chrome trace is written to, or None to print summaries
+        - iteration: the number of the current iteration, starting at 1
+        - stats: maps each stage name to its stats in the current iteration
+        - events: the Chrome trace events of the stage runs recorded since they were last
+          reported or taken
+
+    Representation Invariants:
+        - self.iteration >= 1
+    """
+    enabled: bool
+    memory: bool
+    trace_path: Optional[str]
+    iteration: int
+    stats: Dict[str, StageStats]
+    events: List[dict]
+    _lock: threading.Lock
+    _local: threading.local
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.memory = False
+        self.trace_path = None
+        self.iteration = 1
+        self.stats = {}
+        self.events = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enable(self, output: str = 'summary', memory: bool = True) -> None:
+        """Start recording stages, and their peak memory if memory is True. If output
+        names a .json file, a Chrome trace is written to it, otherwise a summary is
+        printed after every iteration.
+        """
+        self.trace_path = output if output.endswith('.json') else None
+        if memory and not self.memory:
+            tracemalloc.start()
+        self.memory = memory
+        if not self.enabled:
+            self.enabled = True
+            atexit.register(self.finish)
+
+    def enable_in_worker(self, memory: bool = True) -> None:
+        """Start recording stages in a worker process, whose events are handed to the
+        main process with take_events instead of being reported by the worker.
+        """
+        self.enable('summary', memory)
+        atexit.unregister(self.finish)
+
+    def stack(self) -> List[Stage]:
+        """Return the stages running in the current thread, innermost last.
+        """
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def stage(self, name: str) -> object:
+        """Return a context manager recording one run of the stage name.
+        """
+        return Stage(self, name) if self.enabled else DISABLED_STAGE
+
+    def record(self, name: str, start: float, end: float, peak_bytes: int) -> None:
+        """Record a run of the stage name from start to end, in seconds of
+        time.perf_counter, that allocated at most peak_bytes at once.
+        """
+        self.merge([{'name': name, 'cat': 'stage', 'ph': 'X',
+                     'ts': start * 1e6, 'dur': (end - start) * 1e6,
+                     'pid': os.getpid(), 'tid': threading.get_ident(),
+                     'args': {'peak_bytes': peak_bytes}}])
+
+    def merge(self, events: List[dict]) -> None:
+        """Record the stage runs of events, which may come from a worker process.
+        """
+        with self._lock:
+            for event in events:
+                stats = self.stats.setdefault(event['name'], StageStats())
+                stats.calls += 1
+                stats.seconds += event['dur'] / 1e6
+                stats.peak_bytes = max(stats.peak_bytes, event['args']['peak_bytes'])
+                event['args']['iteration'] = self.iteration
+                self.events.append(event)
+
+    def take_events(self) -> List[dict]:
+        """Return the events recorded so far and forget them.
+        """
+        with self._lock:
+            events, self.events = self.events, []
+            self.stats = {}
+        return events
+
+    def summary(self) -> str:
+        """Return a table of the stats of every stage of the current iteration, in the
+        order of STAGE_NAMES.
+
+        >>> profiler = StageProfiler()
+        >>> profiler.record('paste', 0.0, 0.5, 2048)
+        >>> print(profiler.summary())
+        iteration 1    calls    total ms     peak KiB
+        paste              1       500.0          2.0
+        """
+        lines = [f'{"iteration " + str(self.iteration):<14}{"calls":>6}{"total ms":>12}'
+                 f'{"peak KiB":>13}']
+        names = [name for name in STAGE_NAMES if name in self.stats] \
+            + sorted(set(self.stats) - set(STAGE_NAMES))
+        for name in names:
+            stats = self.stats[name]
+            lines.append(f'{name:<14}{stats.calls:>6}{stats.seconds * 1000:>12.1f}'
+                         f'{stats.peak_bytes / 1024:>13.1f}')
+        return '\n'.join(lines)
+
+    def end_iteration(self) -> None:
+        """Report the current iteration and start the next one.
+        """
+        if not self.enabled:
+            return
+        if self.trace_path is None:
+            print(self.summary())
+        else:
+            self.write_trace()
+        with self._lock:
+            self.stats = {}
+            self.iteration += 1
+            if self.trace_path is None:
+                self.events = []
+
+    def write_trace(self) -> None:
+        """Write every event recorded since the profiler was enabled to trace_path in
+        the Chrome trace event format.
+        """
+        with self._lock:
+            events = list(self.events)
+        with open(self.trace_path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+    def finish(self) -> None:
+        """Report the stages recorded since the last iteration ended, if any.
+        """
+        if self.stats:
+            self.end_iteration()
+        elif self.trace_path is not None and self.events:
+            self.write_trace()
+
+
+PROFILER = StageProfiler()
+if os.environ.get(PROFILE_ENV):
+    PROFILER.enable(os.environ[PROFILE_ENV], os.environ.get(PROFILE_MEMORY_ENV) != '0')
+
+
+def stage(name: str) -> object:
+    """Return a context manager recording one run of the stage name with PROFILER.
+    """
+    return PROFILER.stage(name)
+
+
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-io': ['StageProfiler.end_iteration', 'StageProfiler.write_trace'],
+        'extra-imports': ['python_ta.contracts', 'atexit', 'json', 'os', 'threading', 'time',
+                          'tracemalloc'],
+        'max-line-length': 100,
+        'max-args': 7,
+        'max-locals': 25,
+        'disable': ['R1705', 'C0200'],
+    })
+
+    import python_ta.contracts
+
+    python_ta.contracts.DEBUG_CONTRACTS = False
+    python_ta.contracts.check_all_contracts()
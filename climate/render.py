@@ -0,0 +1,779 @@
+""""
+Functions responsible for drawing the data: the graph and table of a city, and the
+maps of the actual and predicted temperatures of every city in a year
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from climate.compute import compute_city_stats, rcp_to_slice, temps_to_rgb, SummaryCube
+from climate.io import CATALOGUE, MAP
+from climate.profiling import PROFILER, stage
+
+# the public names of this module, which main.py re-exports; the caches filled on first
+# use are left out
+__all__ = ['REGION_THRESHOLD', 'TITLE_FONT_NAMES', 'TITLE_FONT_SIZE', 'TITLE_HEIGHT',
+           'ANIMATION_FRAME_DURATION', 'ANIMATION_FORMATS', 'GIF_TRANSPARENT_INDEX',
+           'GIF_BASE_COLOURS', 'WEBP_OPTIONS', 'GRAPH_SERIES', 'TABLE_HEADER', 'GRID_COLUMNS',
+           'GRID_ROW_HEIGHT', 'graph_template', 'table_template', 'grid_template', 'titled',
+           'temperature_graph', 'temperature_table', 'temperature_grid', 'show_figure',
+           'plot_temp_data', 'draw_table', 'load_base_map', 'region_mask', 'region_patch',
+           'colour_map', 'title_font', 'title_strip', 'draw_map', 'render_map', 'render_panel',
+           'compose_map', 'draw_titles', 'map_filename', 'render_inputs_mtime',
+           'init_render_worker', 'render_map_file', 'profiled_render_map_file', 'render_all',
+           'region_colours', 'frame_updates', 'render_frames', 'palette_colours', 'gif_palette',
+           'gif_frames', 'apng_frames', 'paste_changes', 'save_animation', 'show_city_stats',
+           'show_cities_grid']
+
+# plotly and Pillow are slow to import, so they are only imported by the functions that
+# plot or draw, and commands that do neither never pay for them
+if TYPE_CHECKING:
+    from PIL import Image, ImageFont
+
+# the decoded base maps and the region masks of their seed points, filled on first use
+BASE_MAPS = {}
+REGION_MASKS = {}
+REGION_THRESHOLD = 50
+# the region masks cropped to their bounding boxes, with the top left corner of each box
+REGION_PATCHES = {}
+
+# fonts tried in order for the map titles, before falling back to Pillow's default font
+TITLE_FONT_NAMES = ('arial.ttf', 'Arial.ttf', 'DejaVuSans.ttf', 'LiberationSans-Regular.ttf')
+TITLE_FONT_SIZE = 50
+TITLE_HEIGHT = 80
+# the loaded title fonts by size, and the pre-rendered title strips by map width
+TITLE_FONTS = {}
+TITLE_STRIPS = {}
+
+# how long every frame of an animation is shown, in milliseconds
+ANIMATION_FRAME_DURATION = 500
+# the file extensions of the animation formats and the Pillow formats they are saved in
+ANIMATION_FORMATS = {'.gif': 'GIF', '.png': 'PNG', '.apng': 'PNG', '.webp': 'WEBP'}
+# GIF frames use 255 colours, leaving the last palette index for unchanged pixels
+GIF_TRANSPARENT_INDEX = 255
+# the fewest of those colours kept for the base map and titles, the others being the
+# exact colours of the regions
+GIF_BASE_COLOURS = 32
+# WebP images are saved lossless, since lossy WebP shifts the colours of the regions
+WEBP_OPTIONS = {'lossless': True}
+
+
+# the key, trace name and colour of every series of the graph of a city; the colours are
+# plotly's first default colours, fixed so that every cell of a grid uses the same ones
+GRAPH_SERIES = (('RCP 2.6', 'RCP 2.6 Predicted Temperature', '#636efa'),
+                ('RCP 4.5', 'RCP 4.5 Predicted Temperature', '#EF553B'),
+                ('RCP 8.5', 'RCP 8.5 Predicted Temperature', '#00cc96'),
+                ('Actual', 'Actual Temperature', '#ab63fa'))
+TABLE_HEADER = ('Actual Temperature', 'RCP 2.6', '% Difference of RCP 2.6 and Actual Temp',
+                'RCP 4.5', '% Difference of RCP 4.5 and Actual Temp',
+                'RCP 8.5', '% Difference of RCP 8.5 and Actual Temp')
+GRID_COLUMNS = 2
+GRID_ROW_HEIGHT = 400
+# the figures built and validated by plotly once, as plain dictionaries by name; every
+# graph and table copies its template and only fills in the data, since building and
+# validating plotly figures is slow
+FIGURE_TEMPLATES = {}
+
+
+def graph_template() -> dict:
+    """Return the template of the graph of a city, with one empty trace per
+    GRAPH_SERIES.
+    """
+    if 'graph' not in FIGURE_TEMPLATES:
+        import plotly.graph_objects as go
+
+        fig = go.Figure([go.Scatter(mode='lines+markers', name=name, line=dict(color=colour))
+                         for _, name, colour in GRAPH_SERIES])
+        fig.update_layout(
+            title="Actual vs Predicted Temperature",
+            xaxis_title="Years",
+            yaxis_title="Temperature (Celsius)",
+            font=dict(
+                family="Courier New, monospace",
+                size=18)
+        )
+        FIGURE_TEMPLATES['graph'] = fig.to_plotly_json()
+    return FIGURE_TEMPLATES['graph']
+
+
+def table_template() -> dict:
+    """Return the template of the table of a city, with the header of TABLE_HEADER and
+    no cells.
+    """
+    if 'table' not in FIGURE_TEMPLATES:
+        import plotly.graph_objects as go
+
+        fig = go.Figure(data=[go.Table(header=dict(values=list(TABLE_HEADER),
+                                                   line_color='darkslategray',
+                                                   fill_color='lightskyblue'))])
+        fig.update_layout(title="Actual vs Predicted Temperature")
+        FIGURE_TEMPLATES['table'] = fig.to_plotly_json()
+    return FIGURE_TEMPLATES['table']
+
+
+def grid_template(rows: int, columns: int) -> dict:
+    """Return the template of a grid of graphs with the given number of rows and
+    columns, with an empty title above every cell and no traces.
+
+    Preconditions:
+        - rows >= 1
+        - columns >= 1
+    """
+    if ('grid', rows, columns) not in FIGURE_TEMPLATES:
+        from plotly.subplots import make_subplots
+
+        fig = make_subplots(rows=rows, cols=columns, subplot_titles=[' '] * (rows * columns))
+        fig.update_layout(
+            title="Actual vs Predicted Temperature",
+            height=GRID_ROW_HEIGHT * rows,
+            font=dict(family="Courier New, monospace")
+        )
+        FIGURE_TEMPLATES[('grid', rows, columns)] = fig.to_plotly_json()
+    return FIGURE_TEMPLATES[('grid', rows, columns)]
+
+
+def titled(layout: dict, title: str) -> dict:
+    """Return a copy of the figure layout with its title text replaced by title.
+    """
+    return dict(layout, title=dict(layout['title'], text=title))
+
+
+def temperature_graph(years: Sequence[int], rcp_lists: Dict[str, Sequence[float]],
+                      actual_temps: Sequence[float], city_name: str) -> dict:
+    """Return the figure of the graph of the actual and predicted temperatures of the
+    city named city_name, as a dictionary to be shown with show_figure.
+
+    The series may be lists or typed arrays such as the columns of a SummaryCube, and
+    are used as they are rather than copied.
+
+    >>> figure = temperature_graph([2003, 2004], {'RCP 2.6': [1.0, 2.0], 'RCP 4.5': [1.5, 2.5],
+    ...                            'RCP 8.5': [2.0, 3.0]}, [1.2, 2.2], 'Toronto')
+    >>> [trace['name'] for trace in figure['data']][-1], figure['data'][-1]['y']
+    ('Actual Temperature', [1.2, 2.2])
+    """
+    template = graph_template()
+    series = dict(rcp_lists, Actual=actual_temps)
+    return {'data': [dict(trace, x=years, y=series[key])
+                     for trace, (key, _, _) in zip(template['data'], GRAPH_SERIES)],
+            'layout': titled(template['layout'],
+                             "Actual vs Predicted Temperature of " + city_name)}
+
+
+def temperature_table(actual_temps: Sequence[float], rcp_lists: Dict[str, Sequence[float]],
+                      rcp_percentage_difference: Dict[str, Sequence[float]],
+                      city_name: str) -> dict:
+    """Return the figure of the table of the actual and predicted temperatures of the
+    city named city_name and their percentage differences, as a dictionary to be shown
+    with show_figure.
+    """
+    template = table_template()
+    table = template['data'][0]
+    values = [actual_temps]
+    for rcp_type, _, _ in GRAPH_SERIES[:-1]:
+        values += [rcp_lists[rcp_type], rcp_percentage_difference[rcp_type]]
+    return {'data': [dict(table, cells=dict(values=values))],
+            'layout': titled(template['layout'],
+                             "Actual vs Predicted Temperature of " + city_name)}
+
+
+def temperature_grid(cities: List[Tuple[str, Sequence[int], Dict[str, Sequence[float]],
+                                        Sequence[float]]],
+                     columns: int = GRID_COLUMNS) -> dict:
+    """Return the figure of a grid of the graphs of every city, as a dictionary to be
+    shown with show_figure. Every city is a tuple of its name, its years, its RCP lists
+    and its actual temperatures, and the graphs fill the grid row by row.
+
+    The series of the same name share one legend entry, which shows or hides them in
+    every cell at once.
+
+    Preconditions:
+        - columns >= 1
+    """
+    rows = max(1, -(-len(cities) // columns))
+    template = grid_template(rows, columns)
+    traces = graph_template()['data']
+    data = []
+    for cell, (_, years, rcp_lists, actual_temps) in enumerate(cities):
+        axis = str(cell + 1) if cell else ''
+        series = dict(rcp_lists, Actual=actual_temps)
+        data += [dict(trace, x=years, y=series[key], xaxis='x' + axis, yaxis='y' + axis,
+                      legendgroup=key, showlegend=cell == 0)
+                 for trace, (key, _, _) in zip(traces, GRAPH_SERIES)]
+
+    layout = titled(template['layout'], template['layout']['title']['text'])
+    annotations = layout['annotations']
+    layout['annotations'] = [dict(annotation, text=city[0])
+                             for annotation, city in zip(annotations, cities)]
+    return {'data': data, 'layout': layout}
+
+
+def show_figure(figure: dict) -> None:
+    """Show a figure built by temperature_graph, temperature_table or temperature_grid,
+    without validating it again.
+    """
+    import plotly.io as pio
+
+    with stage('show'):
+        pio.show(figure, validate=False)
+
+
+def plot_temp_data(actual_temps_dict: dict, final_low_rcp_list: Sequence[float],
+                   final_median_rcp_list: Sequence[float],
+                   final_high_rcp_list: Sequence[float], city: tuple) -> None:
+    """Plot a line and scatter graph of real and predicted temperatures of city
+        using plotly's line and scatter plots
+    """
+    show_figure(temperature_graph(list(actual_temps_dict),
+                                  {'RCP 2.6': final_low_rcp_list,
+                                   'RCP 4.5': final_median_rcp_list,
+                                   'RCP 8.5': final_high_rcp_list},
+                                  list(actual_temps_dict.values()), city[3]))
+
+
+def draw_table(actual_temps_dict: dict,
+               final_low_rcp_list: Sequence[float],
+               final_median_rcp_list: Sequence[float],
+               final_high_rcp_list: Sequence[float],
+               low_rcp_percentage_difference: Sequence[float],
+               median_rcp_percentage_difference: Sequence[float],
+               high_rcp_percentage_difference: Sequence[float],
+               city: tuple) -> None:
+    """
+    Draw a table of the temperatures of city using a plotly's basic table
+    """
+    show_figure(temperature_table(list(actual_temps_dict.values()),
+                                  {'RCP 2.6': final_low_rcp_list,
+                                   'RCP 4.5': final_median_rcp_list,
+                                   'RCP 8.5': final_high_rcp_list},
+                                  {'RCP 2.6': low_rcp_percentage_difference,
+                                   'RCP 4.5': median_rcp_percentage_difference,
+                                   'RCP 8.5': high_rcp_percentage_difference},
+                                  city[3]))
+
+
+def load_base_map(map_path: str = MAP) -> 'Image.Image':
+    """
+    Returns the decoded base map at map_path, decoding the file only once.
+    The returned image is shared, so callers must copy it before drawing on it
+    """
+    from PIL import Image
+
+    if map_path not in BASE_MAPS:
+        with Image.open(map_path) as map_file:
+            BASE_MAPS[map_path] = map_file.convert('RGB')
+    return BASE_MAPS[map_path]
+
+
+def region_mask(seed: tuple, map_path: str = MAP) -> 'Image.Image':
+    """
+    Returns a mask of the region that a flood fill of the base map from seed covers,
+    computing it only the first time the region is requested
+    """
+    from PIL import ImageChops, ImageDraw
+
+    if (map_path, seed) not in REGION_MASKS:
+        base_map = load_base_map(map_path)
+        with stage('floodfill'):
+            filled_map = base_map.copy()
+            # a fill colour far from the seed colour, so every filled pixel changes
+            fill = tuple(0 if channel >= 128 else 255 for channel in base_map.getpixel(seed))
+            ImageDraw.floodfill(filled_map, seed, fill, thresh=REGION_THRESHOLD)
+            red, green, blue = ImageChops.difference(filled_map, base_map).split()
+            changed = ImageChops.lighter(ImageChops.lighter(red, green), blue)
+            REGION_MASKS[(map_path, seed)] = changed.point(lambda value: 255 if value else 0)
+    return REGION_MASKS[(map_path, seed)]
+
+
+def region_patch(seed: tuple, map_path: str = MAP) -> Tuple[Tuple[int, int], 'Image.Image']:
+    """
+    Returns the top left corner of the bounding box of the region of seed, and the mask
+    of the region cropped to that box, so that only the pixels of the region's box are
+    touched when it is recoloured
+    """
+    if (map_path, seed) not in REGION_PATCHES:
+        mask = region_mask(seed, map_path)
+        box = mask.getbbox() or (0, 0, 1, 1)
+        REGION_PATCHES[(map_path, seed)] = (box[:2], mask.crop(box))
+    return REGION_PATCHES[(map_path, seed)]
+
+
+def colour_map(city_colours: dict, map_path: str = MAP) -> 'Image.Image':
+    """
+    Returns a copy of the base map with the region of every city coloured,
+    where city_colours maps each city to the rgb value of its region
+    """
+    masks = {city: region_mask(city[2], map_path) for city in city_colours}
+    with stage('paste'):
+        coloured_map = load_base_map(map_path).copy()
+        for city, rgb in city_colours.items():
+            coloured_map.paste(rgb, mask=masks[city])
+    return coloured_map
+
+
+def title_font(size: int = TITLE_FONT_SIZE) -> 'ImageFont.ImageFont':
+    """
+    Returns the first font of TITLE_FONT_NAMES that can be loaded at size, or Pillow's
+    default font if none of them is installed, loading it only once per size
+    """
+    from PIL import ImageFont
+
+    if size not in TITLE_FONTS:
+        with stage('font'):
+            for font_name in TITLE_FONT_NAMES:
+                try:
+                    TITLE_FONTS[size] = ImageFont.truetype(font_name, size)
+                    break
+                except OSError:
+                    continue
+            else:
+                try:
+                    TITLE_FONTS[size] = ImageFont.load_default(size)
+                except TypeError:
+                    # Pillow older than 10.1 only has a fixed size default font
+                    TITLE_FONTS[size] = ImageFont.load_default()
+    return TITLE_FONTS[size]
+
+
+def title_strip(width: int) -> tuple:
+    """
+    Returns the title strip above two maps of the given width, with the static part of
+    both titles already drawn, and the positions where the year of each title goes
+    """
+    from PIL import Image, ImageDraw
+
+    if width not in TITLE_STRIPS:
+        font = title_font()
+        with stage('font'):
+            strip = Image.new('RGB', (width * 2, TITLE_HEIGHT))
+            strip_editable = ImageDraw.Draw(strip)
+            year_positions = []
+            for x, title in ((width // 3, 'Actual Temperatures('),
+                             (int(1.3 * width), 'Predicted Temperatures(')):
+                strip_editable.text((x, 10), title, font=font)
+                year_positions.append((x + strip_editable.textlength(title, font=font), 10))
+            TITLE_STRIPS[width] = (strip, year_positions)
+    return TITLE_STRIPS[width]
+
+
+def draw_map(cube: SummaryCube, year: int, rcp_type: str) -> None:
+    """
+    Draws both maps for predicted and actual temperature of the cities in Canada
+    in the given year, looking the temperatures up in cube
+    """
+    new_map = render_map(cube, year, rcp_type)
+    with stage('show'):
+        new_map.show()
+
+
+def render_map(cube: SummaryCube, year: int, rcp_type: str) -> 'Image.Image':
+    """
+    Returns the image of both maps for predicted and actual temperature of the cities
+    in Canada in the given year, looking the temperatures up in cube
+    """
+    # fills the cities for the actual map and the predicted map
+    return compose_map(render_panel(cube, year, 0),
+                       render_panel(cube, year, rcp_to_slice(rcp_type)), year)
+
+
+def render_panel(cube: SummaryCube, year: int, series: int) -> 'Image.Image':
+    """
+    Returns the base map with every city of the cube coloured by its temperature in the
+    given year for the series at index series of the cube
+    """
+    cities = cube.cities
+    colours = temps_to_rgb(cube.get(city, year, series) for city in cities)
+    return colour_map(dict(zip(cities, colours)))
+
+
+def compose_map(map: 'Image.Image', map2: 'Image.Image', year: int) -> 'Image.Image':
+    """
+    Returns the actual map and the predicted map side by side under their titles
+    """
+    from PIL import Image
+
+    width, height = map.size
+
+    with stage('paste'):
+        new_map = Image.new('RGB', (width * 2, height + TITLE_HEIGHT))
+        new_map.paste(map, (0, TITLE_HEIGHT))
+        new_map.paste(map2, (width, TITLE_HEIGHT))
+
+    draw_titles(new_map, year)
+    return new_map
+
+
+def draw_titles(new_map: 'Image.Image', year: int) -> None:
+    """
+    Draws the titles of both maps of year over the title strip of new_map, replacing
+    the titles drawn there before
+    """
+    from PIL import ImageDraw
+
+    strip, year_positions = title_strip(new_map.width // 2)
+    font = title_font()
+    with stage('paste'):
+        new_map.paste(strip, (0, 0))
+
+    # Writes the year of both titles
+    with stage('font'):
+        new_map_editable = ImageDraw.Draw(new_map)
+        for position in year_positions:
+            new_map_editable.text(position, str(year) + ')', font=font)
+
+
+# the summary cube of a render worker process, set once when the worker starts
+WORKER_CUBE = None
+
+
+def map_filename(year: int, rcp_type: str, image_format: str) -> str:
+    """
+    Returns the file name of the rendered map of year and rcp_type
+
+    >>> map_filename(2010, 'RCP 4.5', 'png')
+    'map_2010_rcp45.png'
+    """
+    return 'map_' + str(year) + '_' + rcp_type.replace(' ', '').replace('.', '').lower() \
+        + '.' + image_format
+
+
+def render_inputs_mtime() -> float:
+    """
+    Returns the latest modification time of the datasets and base map that maps are
+    rendered from
+    """
+    paths = [MAP, CATALOGUE.catalogue_path] + [path for city in CATALOGUE.stations()
+                                               for path in city[:2]]
+    return max(os.path.getmtime(path) for path in paths)
+
+
+def init_render_worker(cube: SummaryCube, profile: bool = False,
+                       profile_memory: bool = False) -> None:
+    """
+    Stores the summary cube that a render worker process renders every map from, and
+    enables the profiler of the worker, tracing memory if profile_memory is True, if
+    profile is True
+    """
+    global WORKER_CUBE
+    WORKER_CUBE = cube
+    if profile:
+        PROFILER.enable_in_worker(profile_memory)
+
+
+def render_map_file(year: int, rcp_type: str, path: str) -> str:
+    """
+    Renders the map of year and rcp_type from the worker's cube and saves it to path.
+    The base map and region masks are cached per worker, so every map after the
+    first one of a worker reuses them
+    """
+    options = WEBP_OPTIONS if path.lower().endswith('.webp') else {}
+    render_map(WORKER_CUBE, year, rcp_type).save(path, **options)
+    return path
+
+
+def profiled_render_map_file(year: int, rcp_type: str, path: str) -> Tuple[str, List[dict]]:
+    """
+    Renders the map of year and rcp_type like render_map_file, and also returns the
+    profiler events the worker recorded while rendering it
+    """
+    PROFILER.take_events()
+    render_map_file(year, rcp_type, path)
+    return path, PROFILER.take_events()
+
+
+def render_all(cube: SummaryCube, years: List[int], rcp_types: List[str], out_dir: str,
+               image_format: str = 'png', workers: Optional[int] = None) -> List[str]:
+    """
+    Renders the map of every combination of years and rcp_types into out_dir using a
+    pool of worker processes, skipping maps that are newer than their inputs.
+    Returns the paths of the maps that were rendered
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    inputs_mtime = render_inputs_mtime()
+    jobs = []
+    for year in years:
+        for rcp_type in rcp_types:
+            path = os.path.join(out_dir, map_filename(year, rcp_type, image_format))
+            if not os.path.exists(path) or os.path.getmtime(path) < inputs_mtime:
+                jobs.append((year, rcp_type, path))
+
+    if not jobs:
+        return []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_render_worker,
+                             initargs=(cube, PROFILER.enabled, PROFILER.memory)) as executor:
+        if not PROFILER.enabled:
+            futures = [executor.submit(render_map_file, *job) for job in jobs]
+            return [future.result() for future in futures]
+
+        futures = [executor.submit(profiled_render_map_file, *job) for job in jobs]
+        rendered = []
+        for future in futures:
+            path, events = future.result()
+            PROFILER.merge(events)
+            rendered.append(path)
+        return rendered
+
+
+def region_colours(cube: SummaryCube, year: int, rcp_type: str) -> dict:
+    """
+    Returns the colour of every region of both maps of year, keyed by the panel (0 for
+    the actual map and 1 for the predicted map) and the seed of the region. Where
+    cities share a region the last city of the cube wins, as in colour_map
+    """
+    colours = {}
+    for panel, series in enumerate((0, rcp_to_slice(rcp_type))):
+        cities = cube.cities
+        rgbs = temps_to_rgb(cube.get(city, year, series) for city in cities)
+        for city, rgb in zip(cities, rgbs):
+            colours[(panel, city[2])] = rgb
+    return colours
+
+
+def frame_updates(cube: SummaryCube, years: Iterable[int],
+                  rcp_type: str) -> Iterator[Tuple['Image.Image', list]]:
+    """
+    Yields the image of both maps of every year in years, like render_map, with the
+    position, mask and colour of every region that changed colour since the previous
+    frame, which for the first frame is every region. Only the first frame is rendered
+    in full; every later frame is a copy of the one before it with only the changed
+    regions and the titles drawn again, so unchanged pixels stay identical between
+    frames
+    """
+    frame = None
+    previous_colours = {}
+    for year in years:
+        colours = region_colours(cube, year, rcp_type)
+        first = frame is None
+        frame = render_map(cube, year, rcp_type) if first else frame.copy()
+        width = frame.width // 2
+        changed = []
+        for (panel, seed), rgb in colours.items():
+            if previous_colours.get((panel, seed)) != rgb:
+                (x, y), mask = region_patch(seed)
+                changed.append(((panel * width + x, TITLE_HEIGHT + y), mask, rgb))
+        if not first:
+            with stage('paste'):
+                for position, mask, rgb in changed:
+                    frame.paste(rgb, position, mask)
+            draw_titles(frame, year)
+        yield frame, changed
+        previous_colours = colours
+
+
+def render_frames(cube: SummaryCube, years: Iterable[int],
+                  rcp_type: str) -> Iterator['Image.Image']:
+    """
+    Yields the image of both maps of every year in years, like render_map, redrawing
+    only the regions that changed colour since the previous year
+    """
+    for frame, _ in frame_updates(cube, years, rcp_type):
+        yield frame
+
+
+def palette_colours(image: 'Image.Image', count: int) -> List[Tuple[int, int, int]]:
+    """
+    Returns the first count colours of the palette of image
+    """
+    palette = image.getpalette()[:count * 3]
+    return [tuple(palette[index:index + 3]) for index in range(0, len(palette), 3)]
+
+
+def gif_palette(frame: 'Image.Image', region_rgbs: Iterable[tuple]) \
+        -> Tuple['Image.Image', Dict[tuple, int]]:
+    """
+    Returns a palette image for the GIF frames of an animation starting with frame whose
+    regions are coloured with region_rgbs, and the palette index of every colour of
+    region_rgbs. The region colours come first and are exact unless there are more
+    than GIF_TRANSPARENT_INDEX - GIF_BASE_COLOURS of them, in which case they are
+    reduced to that many; the rest of the palette holds the colours of the base map
+    and titles of frame. The palette leaves out GIF_TRANSPARENT_INDEX
+
+    >>> from PIL import Image
+    >>> palette, indices = gif_palette(Image.new('RGB', (4, 4), (9, 9, 9)),
+    ...                                [(0, 255, 66), (13, 255, 0)])
+    >>> palette_colours(palette, 3), indices[(13, 255, 0)]
+    ([(0, 255, 66), (13, 255, 0), (9, 9, 9)], 1)
+    """
+    from PIL import Image
+
+    region_rgbs = sorted(set(region_rgbs))
+    limit = GIF_TRANSPARENT_INDEX - GIF_BASE_COLOURS
+    if len(region_rgbs) <= limit:
+        colours = list(region_rgbs)
+        indices = {rgb: index for index, rgb in enumerate(region_rgbs)}
+    else:
+        strip = Image.new('RGB', (len(region_rgbs), 1))
+        strip.putdata(region_rgbs)
+        reduced = strip.quantize(limit, Image.Quantize.MEDIANCUT)
+        colours = palette_colours(reduced, limit)
+        indices = dict(zip(region_rgbs, reduced.tobytes()))
+
+    base = frame.quantize(GIF_TRANSPARENT_INDEX - len(colours), Image.Quantize.MEDIANCUT)
+    colours += palette_colours(base, GIF_TRANSPARENT_INDEX - len(colours))
+    # the unused entries, including GIF_TRANSPARENT_INDEX, repeat the first colour so
+    # that no pixel is mapped to one of them in preference to it
+    colours += [colours[0]] * (GIF_TRANSPARENT_INDEX + 1 - len(colours))
+    palette = Image.new('P', (1, 1))
+    palette.putpalette([channel for rgb in colours for channel in rgb])
+    return palette, indices
+
+
+def gif_frames(updates: Iterable[Tuple['Image.Image', list]],
+               region_rgbs: Iterable[tuple]) -> Iterator['Image.Image']:
+    """
+    Yields the GIF frames of the frames of updates, whose regions are coloured with
+    region_rgbs, on the one palette of gif_palette. The regions are pasted with the
+    palette index of their colour rather than quantized, so they keep their exact
+    colours. Every frame after the first holds only its changed regions and titles,
+    with every other pixel GIF_TRANSPARENT_INDEX, so the previous frame shows through
+    and only the changes are encoded
+    """
+    from PIL import Image
+
+    # a quantized pixel that lands on GIF_TRANSPARENT_INDEX is moved to the same colour
+    # at index 0, so it does not turn transparent
+    opaque = list(range(GIF_TRANSPARENT_INDEX + 1))
+    opaque[GIF_TRANSPARENT_INDEX] = 0
+
+    palette = indices = None
+    for frame, changed in updates:
+        if palette is None:
+            palette, indices = gif_palette(frame, region_rgbs)
+            indexed = frame.quantize(palette=palette, dither=Image.Dither.NONE).point(opaque)
+        else:
+            indexed = Image.new('P', frame.size, GIF_TRANSPARENT_INDEX)
+            indexed.putpalette(palette.getpalette())
+            titles = frame.crop((0, 0, frame.width, TITLE_HEIGHT))
+            with stage('paste'):
+                indexed.paste(titles.quantize(palette=palette, dither=Image.Dither.NONE)
+                              .point(opaque), (0, 0))
+        with stage('paste'):
+            for position, mask, rgb in changed:
+                indexed.paste(indices[rgb], position, mask)
+        yield indexed
+
+
+def apng_frames(updates: Iterable[Tuple['Image.Image', list]]) -> Iterator['Image.Image']:
+    """
+    Yields the animated PNG frames of the frames of updates. Every frame after the
+    first holds only its changed regions and titles, with every other pixel fully
+    transparent, so that blending it over the previous frame shows the changes
+    """
+    from PIL import Image
+
+    for index, (frame, changed) in enumerate(updates):
+        if index == 0:
+            yield frame.convert('RGBA')
+        else:
+            delta = Image.new('RGBA', frame.size, (0, 0, 0, 0))
+            paste_changes(delta, frame, changed)
+            yield delta
+
+
+def paste_changes(delta: 'Image.Image', frame: 'Image.Image', changed: list) -> None:
+    """
+    Copies the titles and the changed regions of frame onto delta, where changed holds
+    the positions, masks and colours of the regions as yielded by frame_updates
+    """
+    with stage('paste'):
+        delta.paste(frame.crop((0, 0, frame.width, TITLE_HEIGHT)), (0, 0))
+        for (x, y), mask, _ in changed:
+            box = (x, y, x + mask.width, y + mask.height)
+            delta.paste(frame.crop(box), box, mask)
+
+
+def save_animation(cube: SummaryCube, years: Iterable[int], rcp_type: str, path: str,
+                   duration: int = ANIMATION_FRAME_DURATION) -> str:
+    """
+    Saves an animation of the maps of every year in years for rcp_type to path, showing
+    every frame for duration milliseconds. The format is chosen by the extension of
+    path, one of ANIMATION_FORMATS: an animated GIF, an animated PNG or an animated
+    WebP. Returns path
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in ANIMATION_FORMATS:
+        raise ValueError('Unknown animation format: ' + extension)
+
+    from PIL import PngImagePlugin
+
+    # the GIF and PNG frames are reduced to their changes here, which Pillow's GIF
+    # optimizer would otherwise search for pixel by pixel, while the WebP encoder finds
+    # the changed parts of full frames itself
+    years = list(years)
+    if extension == '.gif':
+        region_rgbs = {rgb for year in years
+                       for rgb in region_colours(cube, year, rcp_type).values()}
+        frames = list(gif_frames(frame_updates(cube, years, rcp_type), region_rgbs))
+        options = {'transparency': GIF_TRANSPARENT_INDEX, 'disposal': 1, 'optimize': False}
+    elif extension == '.webp':
+        frames = list(render_frames(cube, years, rcp_type))
+        options = WEBP_OPTIONS
+    else:
+        frames = list(apng_frames(frame_updates(cube, years, rcp_type)))
+        options = {'blend': PngImagePlugin.Blend.OP_OVER,
+                   'disposal': PngImagePlugin.Disposal.OP_NONE}
+
+    frames[0].save(path, ANIMATION_FORMATS[extension], save_all=True, append_images=frames[1:],
+                   duration=duration, loop=0, **options)
+    return path
+
+
+def show_city_stats(city: tuple, stats: Optional[tuple] = None) -> None:
+    """
+    Plots the graph and draws the table of one city, from stats if it has already
+    been computed by compute_city_stats
+    """
+    actual_temps_dict, rcp_lists, rcp_percentage_difference = \
+        stats or compute_city_stats(city)
+    final_low_rcp_list = rcp_lists['RCP 2.6']
+    final_median_rcp_list = rcp_lists['RCP 4.5']
+    final_high_rcp_list = rcp_lists['RCP 8.5']
+    with stage('plot'):
+        plot_temp_data(actual_temps_dict, final_low_rcp_list,
+                       final_median_rcp_list, final_high_rcp_list, city)
+    with stage('table'):
+        draw_table(actual_temps_dict, final_low_rcp_list, final_median_rcp_list,
+                   final_high_rcp_list,
+                   rcp_percentage_difference['RCP 2.6'],
+                   rcp_percentage_difference['RCP 4.5'],
+                   rcp_percentage_difference['RCP 8.5'],
+                   city)
+
+
+def show_cities_grid(cities: List[tuple], columns: int = GRID_COLUMNS) -> None:
+    """
+    Plots the graphs of every city in cities in one grid with the given number of
+    columns
+    """
+    grid_cities = []
+    for city in cities:
+        actual_temps_dict, rcp_lists, _ = compute_city_stats(city)
+        grid_cities.append((city[3], list(actual_temps_dict), rcp_lists,
+                            list(actual_temps_dict.values())))
+    with stage('plot'):
+        figure = temperature_grid(grid_cities, columns)
+    show_figure(figure)
+
+
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-io': [],
+        'extra-imports': ['python_ta.contracts', 'os', 'concurrent.futures',
+                          'plotly.graph_objects', 'plotly.io', 'plotly.subplots', 'PIL',
+                          'climate.compute', 'climate.io', 'climate.profiling'],
+        'max-line-length': 100,
+        'max-args': 8,
+        'max-locals': 25,
+        'disable': ['R1705', 'C0200'],
+    })
+
+    import python_ta.contracts
+
+    python_ta.contracts.DEBUG_CONTRACTS = False
+    python_ta.contracts.check_all_contracts()
@@ -0,0 +1,188 @@
+""""
+A static report of every city and map, written in one run
+
+The report is a directory that opens in a browser without a server:
+
+    - index.html: one page with a graph and table of any city and a map of any year
+    - plotly-<version>.min.js: the plotly.js bundle, shared by every figure of the page
+      and by every report written into the same directory
+    - maps/: the map of every year and RCP type, rendered by render_all
+
+The series of every city are embedded in index.html as one compact JSON payload,
+together with the figure templates of climate.render, so the page only fills the
+arrays of the selected city into the templates instead of inlining a figure (and a
+copy of plotly.js) per city.
+"""
+import json
+import os
+from string import Template
+from typing import Dict, List, Optional
+
+from climate.compute import SummaryCube, city_series
+from climate.render import GRAPH_SERIES, graph_template, map_filename, render_all, \
+    table_template
+
+REPORT_PAGE = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Actual vs Predicted Temperature</title>
+<script src="$plotlyjs"></script>
+<style>
+body { font-family: "Courier New", monospace; margin: 2em; }
+select { font-size: 1em; margin-right: 1em; }
+#map { max-width: 100%; }
+</style>
+</head>
+<body>
+<h1>Actual vs Predicted Temperature</h1>
+<label>City <select id="city"></select></label>
+<div id="graph"></div>
+<p id="coverage"></p>
+<div id="table"></div>
+<h2>Maps</h2>
+<label>Year <select id="year"></select></label>
+<label>RCP <select id="rcp"></select></label>
+<div><img id="map" alt=""></div>
+<script type="application/json" id="report-data">$payload</script>
+<script>
+const report = JSON.parse(document.getElementById('report-data').textContent);
+
+function options(select, values) {
+  for (const value of values) {
+    select.add(new Option(value, value));
+  }
+}
+
+function titled(layout, name) {
+  const title = Object.assign({}, layout.title,
+                              {text: 'Actual vs Predicted Temperature of ' + name});
+  return Object.assign({}, layout, {title: title});
+}
+
+function showCity(index) {
+  const city = report.cities[index];
+  const series = Object.assign({Actual: city.actual}, city.rcp);
+  const graph = report.templates.graph;
+  Plotly.react('graph', graph.data.map((trace, i) => Object.assign(
+    {}, trace, {x: city.years, y: series[report.series[i]]})), titled(graph.layout, city.name));
+
+  const table = report.templates.table;
+  const values = [city.actual];
+  for (const rcpType of report.rcp_types) {
+    values.push(city.rcp[rcpType], city.difference[rcpType]);
+  }
+  Plotly.react('table', [Object.assign({}, table.data[0], {cells: {values: values}})],
+               titled(table.layout, city.name));
+
+  const partial = city.years.map((year, i) => [year, city.months[i]])
+    .filter(([, months]) => months < 12)
+    .map(([year, months]) => year + ' (' + months + ' months)');
+  document.getElementById('coverage').textContent = partial.length
+    ? 'Annual means from incomplete years: ' + partial.join(', ') : '';
+}
+
+function showMap() {
+  const year = document.getElementById('year').value;
+  const rcpType = document.getElementById('rcp').value;
+  const map = document.getElementById('map');
+  map.src = report.maps.files[year][rcpType];
+  map.alt = 'Actual and ' + rcpType + ' temperatures in ' + year;
+}
+
+const citySelect = document.getElementById('city');
+report.cities.forEach((city, index) => citySelect.add(new Option(city.name, index)));
+citySelect.onchange = () => showCity(citySelect.value);
+options(document.getElementById('year'), report.maps.years);
+options(document.getElementById('rcp'), report.maps.rcp_types);
+document.getElementById('year').onchange = showMap;
+document.getElementById('rcp').onchange = showMap;
+if (report.cities.length) {
+  showCity(0);
+}
+if (report.maps.years.length && report.maps.rcp_types.length) {
+  showMap();
+}
+</script>
+</body>
+</html>
+""")
+
+
+def report_payload(cities: List[tuple], years: List[int], rcp_types: List[str],
+                   image_format: str = 'png') -> dict:
+    """Return the data of a report of cities and of the maps of years and rcp_types:
+    the graph and table templates, the series of every city, and the relative path of
+    every map by year and RCP type.
+
+    >>> payload = report_payload([], [2010], ['RCP 4.5'])
+    >>> payload['maps']['files']
+    {'2010': {'RCP 4.5': 'maps/map_2010_rcp45.png'}}
+    """
+    return {'templates': {'graph': graph_template(), 'table': table_template()},
+            'series': [key for key, _, _ in GRAPH_SERIES],
+            'rcp_types': [key for key, _, _ in GRAPH_SERIES[:-1]],
+            'cities': [city_series(city) for city in cities],
+            'maps': {'years': years,
+                     'rcp_types': rcp_types,
+                     'files': {str(year): {rcp_type: 'maps/' + map_filename(year, rcp_type,
+                                                                            image_format)
+                                           for rcp_type in rcp_types}
+                               for year in years}}}
+
+
+def write_plotly_bundle(out_dir: str) -> str:
+    """Write the plotly.js bundle of the installed plotly into out_dir, unless a report
+    written before already did, and return its file name.
+    """
+    import plotly
+    from plotly.offline import get_plotlyjs
+
+    filename = 'plotly-' + plotly.__version__ + '.min.js'
+    path = os.path.join(out_dir, filename)
+    if not os.path.exists(path):
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(get_plotlyjs())
+    return filename
+
+
+def write_report(cube: SummaryCube, cities: List[tuple], years: List[int],
+                 rcp_types: List[str], out_dir: str, image_format: str = 'png',
+                 workers: Optional[int] = None) -> Dict[str, int]:
+    """Write the report of cities and of the maps of years and rcp_types into out_dir,
+    rendering the maps from cube, and return the number of cities and the number of
+    maps rendered (maps that are newer than their inputs are kept).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rendered = render_all(cube, years, rcp_types, os.path.join(out_dir, 'maps'),
+                          image_format, workers)
+    payload = json.dumps(report_payload(cities, years, rcp_types, image_format),
+                         separators=(',', ':'), allow_nan=False)
+    page = REPORT_PAGE.substitute(plotlyjs=write_plotly_bundle(out_dir),
+                                  payload=payload.replace('</', '<\\/'))
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as file:
+        file.write(page)
+    return {'cities': len(cities), 'maps': len(rendered)}
+
+
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-io': ['write_plotly_bundle', 'write_report'],
+        'extra-imports': ['python_ta.contracts', 'json', 'os', 'string', 'plotly',
+                          'plotly.offline', 'climate.compute', 'climate.render'],
+        'max-line-length': 100,
+        'max-args': 7,
+        'max-locals': 25,
+        'disable': ['R1705', 'C0200'],
+    })
+
+    import python_ta.contracts
+
+    python_ta.contracts.DEBUG_CONTRACTS = False
+    python_ta.contracts.check_all_contracts()
@@ -0,0 +1,156 @@
+""""
+Queries of the seasonal temperatures of the actual datasets
+
+The monthly columns of every actual dataset are aggregated into seasons (see
+climate.io.seasonal_columns) once per dataset and kept in STORE, so every query below
+is a selection over those typed columns rather than another pass over the CSV files.
+Seasons are the meteorological DJF, MAM, JJA and SON, and December counts towards
+the DJF season of the following year.
+"""
+import math
+from itertools import compress
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from climate.io import SEASONS, STORE
+
+# the fewest months with a mean temperature a season needs to be reported
+SEASON_MIN_MONTHS = 3
+SEASON_STATISTICS = ('mean', 'min', 'max', 'anomaly')
+
+
+def season_rows(actual_data_filepath: str, season: str,
+                min_months: int = SEASON_MIN_MONTHS) -> List[int]:
+    """Return the indices of the seasonal columns of an actual dataset that belong to
+    season and have at least min_months months with a mean temperature.
+
+    Preconditions:
+        - season in SEASONS
+        - 1 <= min_months <= 3
+    """
+    columns = STORE.seasonal(actual_data_filepath)
+    season_index = SEASONS.index(season)
+    selected = [row_season == season_index and months >= min_months
+                for row_season, months in zip(columns['season'], columns['months'])]
+    return list(compress(range(len(selected)), selected))
+
+
+def seasonal_means(actual_data_filepath: str, season: str,
+                   min_months: int = SEASON_MIN_MONTHS) -> Dict[int, float]:
+    """Return a mapping of year to the mean temperature of season in that year, for
+    every year whose season has at least min_months months with a mean temperature.
+
+    Preconditions:
+        - season in SEASONS
+        - 1 <= min_months <= 3
+    """
+    columns = STORE.seasonal(actual_data_filepath)
+    years = columns['year']
+    means = columns['mean']
+    return {years[row]: round(means[row], 2)
+            for row in season_rows(actual_data_filepath, season, min_months)}
+
+
+def seasonal_extremes(actual_data_filepath: str, season: str,
+                      min_months: int = SEASON_MIN_MONTHS) -> Dict[int, Tuple[float, float]]:
+    """Return a mapping of year to the lowest and highest temperatures of season in that
+    year, for every year whose season has at least min_months months with a mean
+    temperature.
+
+    Preconditions:
+        - season in SEASONS
+        - 1 <= min_months <= 3
+    """
+    columns = STORE.seasonal(actual_data_filepath)
+    years = columns['year']
+    lows = columns['min']
+    highs = columns['max']
+    return {years[row]: (lows[row], highs[row])
+            for row in season_rows(actual_data_filepath, season, min_months)}
+
+
+def seasonal_climatology(actual_data_filepath: str, season: str,
+                         baseline: Optional[range] = None,
+                         min_months: int = SEASON_MIN_MONTHS) -> float:
+    """Return the mean of the seasonal means of season over the years of baseline, or
+    over every year if baseline is None, or nan if no year of baseline has the season.
+
+    Preconditions:
+        - season in SEASONS
+        - 1 <= min_months <= 3
+    """
+    columns = STORE.seasonal(actual_data_filepath)
+    years = columns['year']
+    means = columns['mean']
+    baseline_means = [means[row]
+                      for row in season_rows(actual_data_filepath, season, min_months)
+                      if baseline is None or years[row] in baseline]
+    return sum(baseline_means) / len(baseline_means) if baseline_means else math.nan
+
+
+def seasonal_anomalies(actual_data_filepath: str, season: str,
+                       baseline: Optional[range] = None,
+                       min_months: int = SEASON_MIN_MONTHS) -> Dict[int, float]:
+    """Return a mapping of year to how much warmer season was in that year than its
+    climatology over baseline (see seasonal_climatology), for every year whose season
+    has at least min_months months with a mean temperature.
+
+    Preconditions:
+        - season in SEASONS
+        - 1 <= min_months <= 3
+    """
+    climatology = seasonal_climatology(actual_data_filepath, season, baseline, min_months)
+    columns = STORE.seasonal(actual_data_filepath)
+    years = columns['year']
+    means = columns['mean']
+    return {years[row]: round(means[row] - climatology, 2)
+            for row in season_rows(actual_data_filepath, season, min_months)}
+
+
+def compare_seasons(cities: Iterable[tuple], season: str, statistic: str = 'mean',
+                    baseline: Optional[range] = None,
+                    min_months: int = SEASON_MIN_MONTHS) -> Dict[Any, Dict[int, float]]:
+    """Return a mapping of every city to its statistic of season by year, where
+    statistic is one of SEASON_STATISTICS: the seasonal 'mean', the lowest 'min' or
+    highest 'max' temperature, or the 'anomaly' against the baseline climatology.
+
+    Each city is a tuple whose first element is its actual dataset path, like the
+    stations of CATALOGUE.
+
+    Preconditions:
+        - season in SEASONS
+        - statistic in SEASON_STATISTICS
+        - 1 <= min_months <= 3
+    """
+    comparison = {}
+    for city in cities:
+        if statistic == 'mean':
+            comparison[city] = seasonal_means(city[0], season, min_months)
+        elif statistic == 'anomaly':
+            comparison[city] = seasonal_anomalies(city[0], season, baseline, min_months)
+        else:
+            extreme = 0 if statistic == 'min' else 1
+            comparison[city] = {year: extremes[extreme] for year, extremes in
+                                seasonal_extremes(city[0], season, min_months).items()}
+    return comparison
+
+
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-io': [],
+        'extra-imports': ['python_ta.contracts', 'math', 'itertools', 'climate.io'],
+        'max-line-length': 100,
+        'max-args': 7,
+        'max-locals': 25,
+        'disable': ['R1705', 'C0200'],
+    })
+
+    import python_ta.contracts
+
+    python_ta.contracts.DEBUG_CONTRACTS = False
+    python_ta.contracts.check_all_contracts()
@@ -0,0 +1,197 @@
+""""
+A local HTTP service for the maps, graphs and tables of the project
+
+The datasets, summary cube and base map are loaded once when the server starts,
+and every response is kept in an LRU cache keyed by its endpoint and parameters.
+
+Endpoints:
+    - /map?year=2010&rcp=RCP 4.5    the actual and predicted maps as a PNG image
+    - /series?city=Toronto          the yearly series of a city as JSON, with the
+                                    months of data behind every annual mean
+    - /table?city=Toronto           the table of a city as HTML
+"""
+import html
+import io
+import json
+import threading
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import parse_qs, urlparse
+
+from climate.compute import INGEST_WORKERS, build_summary_cube, city_series, \
+    compute_city_stats, extract_rcp_bands, json_value, SummaryCube
+from climate.io import CATALOGUE, DATASETS_DIR, RCP_TYPES, STORE, read_predicted_data
+from climate.render import load_base_map, render_map
+
+RESPONSE_CACHE_SIZE = 256
+
+# the summary cube the maps are rendered from, set by serve before the server starts
+SERVER_CUBE = None
+# Pillow drawing is not shared between threads, so maps are rendered one at a time
+RENDER_LOCK = threading.Lock()
+
+
+class ResponseError(Exception):
+    """Raised when a request cannot be answered.
+
+    Instance Attributes:
+        - status: the HTTP status code of the error response
+    """
+    status: int
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def find_city(city_name: str) -> tuple:
+    """Return the station named city_name, or raise a 404 ResponseError.
+    """
+    city = CATALOGUE.find(city_name)
+    if city is None:
+        raise ResponseError(404, 'Unknown city: ' + city_name)
+    return city
+
+
+def map_response(cube: SummaryCube, year: str, rcp_type: str) -> Tuple[str, bytes]:
+    """Return the content type and body of the map of year and rcp_type.
+    """
+    if not year.isdigit() or int(year) not in cube.years:
+        raise ResponseError(400, 'year must be between ' + str(cube.years.start) + ' and '
+                            + str(cube.years.stop - 1))
+    if rcp_type not in RCP_TYPES:
+        raise ResponseError(400, 'rcp must be one of ' + ', '.join(RCP_TYPES))
+
+    with RENDER_LOCK:
+        image = render_map(cube, int(year), rcp_type)
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return 'image/png', buffer.getvalue()
+
+
+def series_response(city_name: str) -> Tuple[str, bytes]:
+    """Return the content type and body of the JSON series of the city named city_name.
+    """
+    city = find_city(city_name)
+    city_data = city_series(city)
+    predicted_temps_dict = read_predicted_data(city[1], dict.fromkeys(city_data['years']))
+    series = {
+        'city': city_data['name'],
+        'years': city_data['years'],
+        'months': city_data['months'],
+        'actual': city_data['actual'],
+        'predicted': {rcp_type: {band: [json_value(temp) for temp in values]
+                                 for band, values in
+                                 extract_rcp_bands(predicted_temps_dict, rcp_type).items()}
+                      for rcp_type in city_data['rcp']},
+        'percentage_difference': city_data['difference'],
+    }
+    return 'application/json', json.dumps(series).encode()
+
+
+def table_response(city_name: str) -> Tuple[str, bytes]:
+    """Return the content type and body of the HTML table of the city named city_name.
+    """
+    city = find_city(city_name)
+    actual_temps_dict, rcp_lists, rcp_percentage_difference = compute_city_stats(city)
+    coverage = STORE.yearly_coverage(city[0])
+    header = ['Year', 'Months of Data', 'Actual Temperature']
+    columns = [list(actual_temps_dict), [coverage[year] for year in actual_temps_dict],
+               list(actual_temps_dict.values())]
+    for rcp_type in rcp_lists:
+        header += [rcp_type, '% Difference of ' + rcp_type + ' and Actual Temp']
+        columns += [rcp_lists[rcp_type], rcp_percentage_difference[rcp_type]]
+
+    rows = ['<tr>' + ''.join('<th>' + html.escape(title) + '</th>' for title in header)
+            + '</tr>']
+    for row in zip(*columns):
+        rows.append('<tr>' + ''.join('<td>' + str(value) + '</td>' for value in row) + '</tr>')
+
+    title = html.escape('Actual vs Predicted Temperature of ' + city[3])
+    body = ('<!DOCTYPE html><html><head><meta charset="utf-8"><title>' + title
+            + '</title></head><body><h1>' + title + '</h1><table border="1">'
+            + ''.join(rows) + '</table></body></html>')
+    return 'text/html; charset=utf-8', body.encode()
+
+
+@lru_cache(maxsize=RESPONSE_CACHE_SIZE)
+def cached_response(endpoint: str, params: Tuple[Tuple[str, str], ...]) -> Tuple[str, bytes]:
+    """Return the content type and body of endpoint for the sorted query parameters params.
+    """
+    query = dict(params)
+    if endpoint == '/map':
+        return map_response(SERVER_CUBE, query.get('year', ''), query.get('rcp', ''))
+    elif endpoint == '/series':
+        return series_response(query.get('city', ''))
+    elif endpoint == '/table':
+        return table_response(query.get('city', ''))
+    else:
+        raise ResponseError(404, 'Unknown endpoint: ' + endpoint)
+
+
+class ClimateRequestHandler(BaseHTTPRequestHandler):
+    """Answers GET requests to the endpoints of the server from the response cache.
+    """
+
+    def do_GET(self) -> None:
+        """Send the response of the requested endpoint.
+        """
+        url = urlparse(self.path)
+        params = tuple(sorted((name, values[-1])
+                              for name, values in parse_qs(url.query).items()))
+        try:
+            content_type, body = cached_response(url.path, params)
+        except ResponseError as error:
+            self.send_error(error.status, str(error))
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host: str = '127.0.0.1', port: int = 8000,
+          ingest_workers: int = INGEST_WORKERS) -> None:
+    """Load the datasets, parsing them in ingest_workers processes, and the base map,
+    then answer requests until interrupted.
+    """
+    global SERVER_CUBE
+    STORE.load_directory(DATASETS_DIR, ingest_workers)
+    SERVER_CUBE = build_summary_cube(CATALOGUE.stations(), ingest_workers)
+    load_base_map()
+
+    server = ThreadingHTTPServer((host, port), ClimateRequestHandler)
+    print('Serving on http://' + host + ':' + str(server.server_port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    import doctest
+
+    doctest.testmod(verbose=True)
+
+    import python_ta
+
+    python_ta.check_all(config={
+        'allowed-io': ['serve'],
+        'extra-imports': ['python_ta.contracts', 'html', 'io', 'json', 'threading',
+                          'functools', 'http.server', 'urllib.parse', 'climate.compute',
+                          'climate.io', 'climate.render'],
+        'max-line-length': 100,
+        'max-args': 7,
+        'max-locals': 25,
+        'disable': ['R1705', 'C0200'],
+    })
+
+    import python_ta.contracts
+
+    python_ta.contracts.DEBUG_CONTRACTS = False
+    python_ta.contracts.check_all_contracts()
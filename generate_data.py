@@ -0,0 +1,161 @@
+""""
+A generator of synthetic datasets in the format of the real ones
+
+Writes an actual and a predicted dataset for each of any number of stations over
+any number of years, together with a station catalogue in the format of
+datasets/stations.csv, so the project can be run and benchmarked at scale without
+real data. The same seed always produces the same files. Missing months (rows with
+no mean temperature) and gap years (years left out of an actual dataset) can be
+injected to exercise the handling of incomplete data:
+
+    python generate_data.py synthetic --stations 1000 --years 100 --missing-months 0.02
+"""
+import argparse
+import math
+import os
+import random
+from typing import List, TextIO
+
+from climate.io import ACTUAL_SUFFIX, CATALOGUE, PREDICTED_SUFFIX, RCP_TYPES, Station, \
+    read_station_catalogue
+
+ACTUAL_HEADER = ('STATION_NAME,PROVINCE_CODE,LOCAL_YEAR,LOCAL_MONTH,MEAN_TEMPERATURE,'
+                 'DAYS_WITH_VALID_MEAN_TEMP,MIN_TEMPERATURE,MAX_TEMPERATURE')
+PREDICTED_HEADER = 'Date' + ''.join(', ' + rcp_type + ' ' + band for rcp_type in RCP_TYPES
+                                    for band in ('Range (low)', 'Median', 'Range (high)'))
+CATALOGUE_HEADER = ('STATION_ID,NAME,PROVINCE_CODE,ACTUAL_PATH,PREDICTED_PATH,SEED_X,SEED_Y,'
+                    'LATITUDE,LONGITUDE')
+# the warming in degrees per year of the median of every RCP type
+RCP_WARMING = {'RCP 2.6': 0.01, 'RCP 4.5': 0.025, 'RCP 8.5': 0.05}
+DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def write_actual_dataset(file: TextIO, station: Station, first_year: int, years: int,
+                         rng: random.Random, missing_months: float = 0.0,
+                         gap_years: float = 0.0) -> None:
+    """Write the monthly actual temperatures of station to file, starting at first_year.
+
+    Every month has a seasonal mean temperature around a base drawn from rng. A
+    fraction missing_months of the months have no mean temperature, and a fraction
+    gap_years of the years are left out entirely.
+
+    Preconditions:
+        - years >= 0
+        - 0.0 <= missing_months <= 1.0
+        - 0.0 <= gap_years <= 1.0
+    """
+    base = rng.uniform(-5.0, 15.0)
+    amplitude = rng.uniform(8.0, 18.0)
+    station_name = station.name.upper()
+    file.write(ACTUAL_HEADER + '\n')
+    for year in range(first_year, first_year + years):
+        if rng.random() < gap_years:
+            continue
+        for month in range(1, 13):
+            if rng.random() < missing_months:
+                file.write(f'{station_name},{station.province},{year},{month},,0,,\n')
+                continue
+            mean_temp = base - amplitude * math.cos(2 * math.pi * (month - 0.5) / 12) \
+                + rng.gauss(0.0, 1.5)
+            spread = rng.uniform(8.0, 15.0)
+            file.write(f'{station_name},{station.province},{year},{month},{mean_temp:.9f},'
+                       f'{DAYS_IN_MONTH[month - 1]},{mean_temp - spread:.1f},'
+                       f'{mean_temp + spread:.1f}\n')
+
+
+def write_predicted_dataset(file: TextIO, first_year: int, years: int,
+                            rng: random.Random) -> None:
+    """Write the yearly predicted temperatures of every RCP type to file, starting at
+    first_year, with a median warming by RCP_WARMING every year.
+
+    Preconditions:
+        - years >= 0
+    """
+    base = rng.uniform(-5.0, 15.0)
+    file.write(PREDICTED_HEADER + '\n')
+    for year in range(first_year, first_year + years):
+        row = [f'01-01-{year % 100:02d}']
+        for rcp_type in RCP_TYPES:
+            median = base + RCP_WARMING[rcp_type] * (year - first_year) + rng.gauss(0.0, 0.3)
+            row += [f'{median - rng.uniform(0.3, 1.0):.2f}', f'{median:.2f}',
+                    f'{median + rng.uniform(0.3, 1.0):.2f}']
+        file.write(','.join(row) + '\n')
+
+
+def write_catalogue(catalogue_path: str, stations: List[Station]) -> None:
+    """Write stations to a catalogue CSV file, with their dataset paths relative to the
+    directory of the catalogue.
+    """
+    directory = os.path.dirname(catalogue_path)
+    with open(catalogue_path, 'w') as file:
+        file.write(CATALOGUE_HEADER + '\n')
+        for station in stations:
+            file.write(','.join([station.station_id, station.name, station.province,
+                                 os.path.relpath(station.actual_path, directory),
+                                 os.path.relpath(station.predicted_path, directory),
+                                 str(station.seed[0]), str(station.seed[1]),
+                                 f'{station.latitude:.2f}', f'{station.longitude:.2f}'])
+                       + '\n')
+
+
+def generate_datasets(directory: str, stations: int, years: int, first_year: int = 2000,
+                      seed: int = 110, missing_months: float = 0.0,
+                      gap_years: float = 0.0) -> List[Station]:
+    """Write the actual and predicted datasets of the given number of synthetic stations
+    into directory, each covering the given number of years from first_year, together
+    with their catalogue stations.csv, and return the stations as read back from it.
+
+    Every station is generated from its own random generator derived from seed, so a
+    station's datasets do not depend on how many stations are generated. Stations
+    reuse the map seeds, provinces and coordinates of CATALOGUE in turn, so they can
+    be drawn on the map.
+
+    Preconditions:
+        - stations >= 0
+        - years >= 0
+        - first_year >= 2000
+        - 0.0 <= missing_months <= 1.0
+        - 0.0 <= gap_years <= 1.0
+    """
+    os.makedirs(directory, exist_ok=True)
+    templates = CATALOGUE.stations()
+    generated = []
+    for number in range(stations):
+        template = templates[number % len(templates)]
+        station_id = 'station' + str(number)
+        station = Station(os.path.join(directory, station_id + ACTUAL_SUFFIX),
+                          os.path.join(directory, station_id + PREDICTED_SUFFIX),
+                          template.seed, 'Station ' + str(number), station_id,
+                          template.province, template.latitude, template.longitude)
+        rng = random.Random(seed * 1000003 + number)
+        with open(station.actual_path, 'w') as file:
+            write_actual_dataset(file, station, first_year, years, rng, missing_months,
+                                 gap_years)
+        with open(station.predicted_path, 'w') as file:
+            write_predicted_dataset(file, first_year, years, rng)
+        generated.append(station)
+
+    catalogue_path = os.path.join(directory, 'stations.csv')
+    write_catalogue(catalogue_path, generated)
+    return read_station_catalogue(catalogue_path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write synthetic actual and predicted '
+                                                 'datasets and their station catalogue.')
+    parser.add_argument('directory', help='directory to write the datasets to')
+    parser.add_argument('--stations', type=int, default=100, help='number of stations')
+    parser.add_argument('--years', type=int, default=100, help='number of years per station')
+    parser.add_argument('--first-year', type=int, default=2000, help='first year of the data')
+    parser.add_argument('--seed', type=int, default=110, help='seed of the generated data')
+    parser.add_argument('--missing-months', type=float, default=0.0,
+                        help='fraction of months without a mean temperature')
+    parser.add_argument('--gap-years', type=float, default=0.0,
+                        help='fraction of years left out of the actual datasets')
+    args = parser.parse_args()
+
+    generate_datasets(args.directory, args.stations, args.years, args.first_year, args.seed,
+                      args.missing_months, args.gap_years)
+    print('Wrote ' + str(args.stations) + ' stations x ' + str(args.years) + ' years to '
+          + args.directory)
+
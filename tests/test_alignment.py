@@ -0,0 +1,70 @@
+""""
+Tests that the actual and predicted temperatures of a city are paired by year
+"""
+import pytest
+
+from climate import io
+from climate.compute import compute_city_stats
+from climate.io import TemperatureStore, read_predicted_data, stream_predicted_data
+from generate_data import ACTUAL_HEADER, PREDICTED_HEADER
+
+ACTUAL_TEMPS = {1998: 4.0, 1999: 4.5, 2000: 5.0, 2001: 5.5, 2002: 6.0}
+
+
+def write_city(directory, first_date_year: int, years: int) -> tuple:
+    """Write an actual dataset of ACTUAL_TEMPS and a predicted dataset whose every RCP
+    type predicts ACTUAL_TEMPS exactly, starting at the two digit year first_date_year,
+    and return the city tuple of the datasets."""
+    actual_path = directory / 'city_actual.csv'
+    predicted_path = directory / 'city_predicted.csv'
+    with open(actual_path, 'w') as file:
+        file.write(ACTUAL_HEADER + '\n')
+        for year, temp in ACTUAL_TEMPS.items():
+            for month in range(1, 13):
+                file.write(f'CITY,ON,{year},{month},{temp},30,{temp - 5},{temp + 5}\n')
+    with open(predicted_path, 'w') as file:
+        file.write(PREDICTED_HEADER + '\n')
+        for offset in range(years):
+            two_digit_year = (first_date_year + offset) % 100
+            temp = ACTUAL_TEMPS.get(1900 + two_digit_year,
+                                    ACTUAL_TEMPS.get(2000 + two_digit_year, 10.0))
+            file.write(f'01-01-{two_digit_year:02d}' + f',{temp}' * 9 + '\n')
+    return str(actual_path), str(predicted_path), (0, 0), 'City'
+
+
+def test_predictions_starting_after_the_actual_data_pair_by_year(tmp_path):
+    actual_temps_dict, rcp_lists, rcp_percentage_difference = \
+        compute_city_stats(write_city(tmp_path, 0, 50))
+
+    assert list(actual_temps_dict) == [2000, 2001, 2002]
+    assert rcp_lists['RCP 4.5'] == [5.0, 5.5, 6.0]
+    assert rcp_percentage_difference['RCP 4.5'] == [0.0, 0.0, 0.0]
+
+
+def test_predictions_in_the_previous_century_take_it_from_the_actual_years(tmp_path):
+    city = write_city(tmp_path, 50, 50)
+
+    assert list(read_predicted_data(city[1], ACTUAL_TEMPS)) == [1998, 1999]
+    actual_temps_dict, _, rcp_percentage_difference = compute_city_stats(city)
+    assert list(actual_temps_dict) == [1998, 1999]
+    assert rcp_percentage_difference['RCP 2.6'] == [0.0, 0.0]
+
+
+@pytest.mark.parametrize('first_date_year', [0, 50])
+def test_streamed_predictions_match_the_stored_ones(tmp_path, monkeypatch, first_date_year):
+    city = write_city(tmp_path, first_date_year, 50)
+    stored = read_predicted_data(city[1], ACTUAL_TEMPS)
+
+    monkeypatch.setattr(io, 'STORE', TemperatureStore(use_cache=False))
+    assert read_predicted_data(city[1], ACTUAL_TEMPS) == stored
+    assert io.STORE.predicted_columns == {}
+
+
+def test_streaming_stops_after_the_last_year_needed(tmp_path):
+    city = write_city(tmp_path, 0, 100)
+    # 2100 would match 2000 a century later, so its values are only read if reading
+    # goes on past 2002
+    with open(city[1], 'a') as file:
+        file.write('01-01-00' + ',not a temperature' * 9 + '\n')
+
+    assert list(stream_predicted_data(city[1], [2000, 2001, 2002])) == [2000, 2001, 2002]
@@ -0,0 +1,45 @@
+""""
+Tests that every animation format decodes to the maps that render_map draws
+"""
+import pytest
+from PIL import Image, ImageChops
+
+from climate.compute import build_summary_cube
+from climate.io import CATALOGUE
+from climate.render import TITLE_HEIGHT, region_colours, region_patch, render_map, \
+    save_animation
+
+YEARS = [2003, 2004, 2005, 2006]
+RCP_TYPE = 'RCP 4.5'
+
+
+@pytest.fixture(scope='module')
+def cube():
+    return build_summary_cube(CATALOGUE.stations())
+
+
+def regions_mask(cube, frame: Image.Image) -> Image.Image:
+    """Return a mask of every region of both maps of frame."""
+    mask = Image.new('L', frame.size, 0)
+    for panel, seed in region_colours(cube, YEARS[0], RCP_TYPE):
+        (x, y), patch = region_patch(seed)
+        mask.paste(255, (panel * (frame.width // 2) + x, TITLE_HEIGHT + y), patch)
+    return mask
+
+
+@pytest.mark.parametrize('extension,exact', [('.gif', False), ('.apng', True),
+                                             ('.webp', True)])
+def test_animation_frames_match_render_map(cube, tmp_path, extension, exact):
+    path = str(tmp_path / ('animation' + extension))
+    save_animation(cube, YEARS, RCP_TYPE, path)
+
+    with Image.open(path) as animation:
+        assert animation.n_frames == len(YEARS)
+        for index, year in enumerate(YEARS):
+            animation.seek(index)
+            decoded = animation.convert('RGB')
+            expected = render_map(cube, year, RCP_TYPE)
+            if not exact:
+                # only the regions keep their exact colours on the GIF palette
+                decoded = Image.composite(decoded, expected, regions_mask(cube, expected))
+            assert ImageChops.difference(decoded, expected).getbbox() is None, year
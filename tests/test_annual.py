@@ -0,0 +1,52 @@
+""""
+Tests that only years with enough months of data get an annual mean
+"""
+from climate.io import ANNUAL_MIN_MONTHS, STORE, TemperatureStore, read_actual_data, \
+    stream_actual_data
+from generate_data import ACTUAL_HEADER
+
+
+def write_actual(directory) -> str:
+    """Write an actual dataset with every month of 2003 at 10 degrees and only the
+    winter months of 2004 at -10 degrees, and return its path."""
+    path = directory / 'city_actual.csv'
+    with open(path, 'w') as file:
+        file.write(ACTUAL_HEADER + '\n')
+        for month in range(1, 13):
+            file.write(f'CITY,ON,2003,{month},10.0,30,5.0,15.0\n')
+        for month in (1, 2, 3, 12):
+            file.write(f'CITY,ON,2004,{month},-10.0,30,-15.0,-5.0\n')
+    return str(path)
+
+
+def test_years_with_few_months_have_no_annual_mean(tmp_path):
+    path = write_actual(tmp_path)
+
+    assert ANNUAL_MIN_MONTHS > 4
+    assert read_actual_data(path) == {2003: 10.0}
+    assert STORE.yearly_coverage(path) == {2003: 12, 2004: 4}
+
+
+def test_threshold_can_be_lowered(tmp_path):
+    path = write_actual(tmp_path)
+
+    assert read_actual_data(path, min_months=4) == {2003: 10.0, 2004: -10.0}
+
+
+def test_store_without_cache_streams_the_file(tmp_path):
+    path = write_actual(tmp_path)
+    store = TemperatureStore(use_cache=False)
+
+    assert store.yearly_means(path, min_months=4) == {2003: 10.0, 2004: -10.0}
+    assert store.yearly_coverage(path) == {2003: 12, 2004: 4}
+    assert store.actual_columns == {}
+
+
+def test_streamed_and_stored_means_agree(tmp_path):
+    path = write_actual(tmp_path)
+    streamed = list(stream_actual_data(path, weighted=True))
+
+    assert [(year, round(mean, 2), months) for year, mean, months in streamed] \
+        == [(2003, 10.0, 12), (2004, -10.0, 4)]
+    assert TemperatureStore(use_cache=False).yearly_means(path, True) \
+        == TemperatureStore(use_cache=True).yearly_means(path, True)
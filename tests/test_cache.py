@@ -0,0 +1,103 @@
+""""
+Tests of when the sidecar cache of a dataset is reused, refreshed or rebuilt
+"""
+import os
+from array import array
+
+import pytest
+
+from climate import cache
+from climate.cache import cache_path, load_columns, read_cache
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'city_actual.csv'
+    path.write_text('1,2,3\n')
+    return str(path)
+
+
+class CountingParser:
+    """A parser of comma separated integers that counts how often it is called."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, source_path: str) -> dict:
+        self.calls += 1
+        with open(source_path) as file:
+            return {'values': array('i', [int(value) for value in file.read().split(',')])}
+
+
+def touch(path: str) -> None:
+    """Move the modification time of path forward without changing its contents."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_unchanged_source_is_read_from_the_cache(source):
+    parse = CountingParser()
+    load_columns(source, parse, 'test-1')
+    columns = load_columns(source, parse, 'test-1')
+
+    assert parse.calls == 1
+    assert isinstance(columns['values'], memoryview)
+    assert list(columns['values']) == [1, 2, 3]
+
+
+def test_touched_source_refreshes_the_cache_without_parsing(source):
+    parse = CountingParser()
+    load_columns(source, parse, 'test-1')
+    touch(source)
+
+    assert list(load_columns(source, parse, 'test-1')['values']) == [1, 2, 3]
+    assert parse.calls == 1
+    # the refreshed cache matches the new modification time, so it is mapped again
+    assert isinstance(read_cache(source, 'test-1')['values'], memoryview)
+
+
+def test_touched_source_in_a_read_only_directory_uses_the_cache(source, monkeypatch):
+    parse = CountingParser()
+    load_columns(source, parse, 'test-1')
+    touch(source)
+
+    def read_only(*args) -> None:
+        raise PermissionError('read-only directory')
+
+    monkeypatch.setattr(cache, 'write_cache', read_only)
+    assert list(load_columns(source, parse, 'test-1')['values']) == [1, 2, 3]
+    assert parse.calls == 1
+
+
+def test_changed_source_is_parsed_again(source):
+    parse = CountingParser()
+    load_columns(source, parse, 'test-1')
+    with open(source, 'w') as file:
+        file.write('4,5\n')
+    touch(source)
+
+    assert list(load_columns(source, parse, 'test-1')['values']) == [4, 5]
+    assert parse.calls == 2
+
+
+def test_new_schema_is_parsed_again(source):
+    parse = CountingParser()
+    load_columns(source, parse, 'test-1')
+
+    assert list(load_columns(source, parse, 'test-2')['values']) == [1, 2, 3]
+    assert parse.calls == 2
+    assert os.path.exists(cache_path(source))
+
+
+def test_source_changed_while_parsing_is_parsed_again(source):
+    def parse_then_edit(source_path: str) -> dict:
+        columns = CountingParser()(source_path)
+        with open(source_path, 'w') as file:
+            file.write('7,8,9,10\n')
+        touch(source_path)
+        return columns
+
+    assert list(load_columns(source, parse_then_edit, 'test-1')['values']) == [1, 2, 3]
+    parse = CountingParser()
+    assert list(load_columns(source, parse, 'test-1')['values']) == [7, 8, 9, 10]
+    assert parse.calls == 1
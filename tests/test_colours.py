@@ -0,0 +1,29 @@
+""""
+Tests that the colour scales give exactly the colours of their colour functions
+"""
+import math
+import random
+
+from climate.compute import ColourTable, temp_to_rgb, temps_to_rgb
+
+
+def test_temps_to_rgb_matches_temp_to_rgb():
+    rng = random.Random(7)
+    temps = [rng.uniform(-10.0, 30.0) for _ in range(10000)] \
+        + [round(rng.gauss(8.0, 6.0), 2) for _ in range(10000)] \
+        + [-0.3, 2.9, 5.6, 17.3, 20.0, math.inf, -math.inf, math.nan]
+    # the temperatures just around every edge of a branch of temp_to_rgb
+    temps += [math.nextafter(edge, direction) for edge in (-0.3, 2.9, 5.6, 17.3, 20.0)
+              for direction in (-math.inf, math.inf)]
+
+    assert temps_to_rgb(temps) == [temp_to_rgb(temp) for temp in temps]
+    # the second time every colour comes from the table
+    assert temps_to_rgb(temps) == [temp_to_rgb(temp) for temp in temps]
+
+
+def test_colour_table_stops_growing_at_its_size():
+    table = ColourTable(temp_to_rgb, 10)
+    temps = [index / 100 for index in range(100)] + [math.nan]
+
+    assert [table[temp] for temp in temps] == [temp_to_rgb(temp) for temp in temps]
+    assert len(table) == 10
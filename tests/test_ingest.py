@@ -0,0 +1,36 @@
+""""
+Tests that datasets parsed by a pool of processes end up in the store of the parent
+"""
+import os
+
+import pytest
+
+from climate import io
+from climate.cache import cache_path
+from climate.io import TemperatureStore, parse_actual_columns, parse_predicted_columns
+from generate_data import generate_datasets
+
+
+@pytest.mark.parametrize('use_cache', [False, True])
+def test_processes_install_their_columns_in_the_store(tmp_path, monkeypatch, use_cache):
+    stations = generate_datasets(str(tmp_path), 4, 10)
+    store = TemperatureStore(use_cache)
+    store.ingest([station[0] for station in stations], [station[1] for station in stations],
+                 workers=2)
+
+    for station in stations:
+        actual_path = os.path.normpath(station[0])
+        predicted_path = os.path.normpath(station[1])
+        assert {name: list(column) for name, column in store.actual_columns[actual_path].items()} \
+            == {name: list(column) for name, column in parse_actual_columns(station[0]).items()}
+        assert list(store.predicted_columns[predicted_path]['RCP 4.5']) \
+            == list(parse_predicted_columns(station[1])['RCP 4.5'])
+        assert os.path.exists(cache_path(station[0])) == use_cache
+
+    # nothing is parsed again once the columns are in the store
+    monkeypatch.setattr(io, 'parse_actual_columns', None)
+    monkeypatch.setattr(io, 'parse_predicted_columns', None)
+    monkeypatch.setattr(io, 'STORE', store)
+    assert len(io.read_actual_data(stations[0][0])) == 10
+    assert store.cities['station0'] == [os.path.normpath(stations[0][0]),
+                                        os.path.normpath(stations[0][1])]
@@ -0,0 +1,35 @@
+""""
+Tests that importing main stays cheap: the plotting libraries are only imported once
+a plot or map is drawn
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# the most time in seconds importing main may take, several times what it takes now so
+# that a slow machine does not fail the test
+STARTUP_BUDGET = 0.5
+
+
+def run_in_fresh_interpreter(code: str) -> str:
+    """Return what code prints when run by a fresh interpreter in the project root."""
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                            capture_output=True, text=True)
+    return result.stdout
+
+
+def test_importing_main_does_not_import_plotly_or_pillow():
+    imported = run_in_fresh_interpreter(
+        'import sys, main; print(*{name.split(".")[0] for name in sys.modules})').split()
+
+    assert 'plotly' not in imported
+    assert 'PIL' not in imported
+
+
+def test_importing_main_stays_within_the_startup_budget():
+    seconds = min(float(run_in_fresh_interpreter(
+        'import time; start = time.perf_counter(); import main; '
+        'print(time.perf_counter() - start)')) for _ in range(3))
+
+    assert seconds < STARTUP_BUDGET